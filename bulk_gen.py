@@ -0,0 +1,221 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from post_gen import get_prompts
+from rate_limit import RateLimiter, estimate_tokens, limited_call
+
+# Bulk post generation for the content calendar: a month of posts at a time.
+#   python bulk_gen.py --tags "Job Search,Motivation" --start 2025-09-01 --days 30 --per-day 1
+# Takes (tag, length, language, date) specs, builds every prompt in one pass over
+# the few-shot corpus, generates the posts concurrently under the Groq rate limit
+# and stores them as they arrive: each batch of posts and their calendar entries
+# (linked by post_id) is one transaction over posts.db with content_calendar.db
+# attached, so a failed write leaves neither.
+
+WRITE_BATCH = 25
+COMPLETION_TOKENS = 400     # a Long post is up to 15 lines
+
+
+def plan_specs(tags, start, days, per_day=1, lengths=("Medium",), languages=("English",)):
+    """
+    Specs for `days` days from `start` (a date or "YYYY-MM-DD"), per_day posts a day,
+    cycling through tags, lengths and languages.
+    Returns a list of dicts with tag, length, language and date ("YYYY-MM-DD").
+    """
+    start = date.fromisoformat(start) if isinstance(start, str) else start
+    specs = []
+    for i in range(days * per_day):
+        specs.append({
+            "tag": tags[i % len(tags)],
+            "length": lengths[i % len(lengths)],
+            "language": languages[i % len(languages)],
+            "date": str(start + timedelta(days=i // per_day)),
+        })
+    return specs
+
+
+def eta_seconds(done, total, elapsed):
+    """Seconds left at the rate so far, or None before the first result."""
+    return elapsed / done * (total - done) if done else None
+
+
+def _calendar_entry(spec, content, post_id):
+    first_line = next((line.strip() for line in content.splitlines() if line.strip()), "")
+    return {"title": f"{spec['tag']} ({spec['length']}, {spec['language']})", "description": first_line[:200],
+            "date": spec["date"], "post_id": post_id}
+
+
+def generate_bulk(specs, model=None, max_workers=8, limiter=None, store=True, on_duplicate=None,
+                  on_progress=None, should_stop=None):
+    """
+    Generate a post per spec (dicts with tag, length, language, date).
+    Every call waits on the rate limiter and is retried with backoff on 429/5xx
+    (for the default model: the shared LLMClient's; `limiter` applies to other models).
+    store: save posts and their calendar entries, WRITE_BATCH posts per transaction
+    on_duplicate: passed to db.insert_posts (default db.ON_DUPLICATE)
+    on_progress(done, total, failed, eta) is called from the calling thread after each post;
+    eta is the estimated seconds left (None before the first result).
+    should_stop() -> True stops early (stats['stopped']): specs not started yet are dropped,
+    posts already being generated are waited for and stored like the others.
+    Returns (results, stats); results keep the spec order, a failed spec has result None
+    and an entry in stats['errors'], a stored post has its id in result['post_id'].
+    """
+    if model is None:
+        # every spec should be a fresh post, also when a tag repeats on another date
+        from llm_helper import get_llm_uncached
+        model = get_llm_uncached()
+    if store:
+        import calendar_db
+        import db
+        import storage
+        db.init_db()
+        calendar_db.init_calendar_db()
+    limiter = limiter or RateLimiter()
+    results = [None] * len(specs)
+    stats = {"specs": len(specs), "generated": 0, "failed": 0, "retries": 0, "errors": [], "stored": 0,
+             "stopped": False}
+    start = time.perf_counter()
+    prompts = get_prompts([(s["length"], s["language"], s["tag"]) for s in specs])
+    stats["prompt_seconds"] = time.perf_counter() - start
+
+    def on_retry(error, attempt):
+        stats["retries"] += 1
+
+    def task(prompt):
+        return limited_call(lambda: model.invoke(prompt).content, model, limiter,
+                            estimate_tokens(prompt, completion_tokens=COMPLETION_TOKENS), on_retry=on_retry)
+
+    batch = []
+
+    def flush():
+        posts = [{"content": results[i]["content"], "tag": specs[i]["tag"], "length": specs[i]["length"],
+                  "language": specs[i]["language"]} for i in batch]
+        with storage.transaction(db.DB_FILE, attach={"calendar": calendar_db.DB_FILE}) as conn:
+            ids, _ = db.insert_posts(conn, posts, on_duplicate or db.ON_DUPLICATE)
+            calendar_db.insert_calendar_entries(
+                conn, [_calendar_entry(specs[i], results[i]["content"], post_id) for i, post_id in zip(batch, ids)],
+                schema="calendar")
+        for i, post_id in zip(batch, ids):
+            results[i]["post_id"] = post_id
+        stats["stored"] += len(batch)
+        batch.clear()
+
+    def collect(future):
+        i = futures[future]
+        try:
+            results[i] = {**specs[i], "content": future.result()}
+            stats["generated"] += 1
+        except Exception as e:
+            stats["failed"] += 1
+            stats["errors"].append((i, e))
+        if results[i] is not None and store:
+            batch.append(i)
+            if len(batch) >= WRITE_BATCH:
+                flush()
+        if on_progress:
+            done = stats["generated"] + stats["failed"]
+            eta = eta_seconds(done, len(specs), time.perf_counter() - start)
+            on_progress(done, len(specs), stats["failed"], eta)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(task, prompt): i for i, prompt in enumerate(prompts)}
+        pending = set(futures)
+        for future in as_completed(futures):
+            pending.discard(future)
+            collect(future)
+            if should_stop and should_stop():
+                stats["stopped"] = True
+                # cancel() fails for posts already being generated: keep those
+                running = [f for f in pending if not f.cancel()]
+                for f in as_completed(running):
+                    collect(f)
+                break
+        if batch:
+            flush()
+
+    stats["errors"].sort(key=lambda item: item[0])
+    stats["seconds"] = time.perf_counter() - start
+    stats["posts_per_sec"] = stats["generated"] / stats["seconds"] if stats["seconds"] else 0.0
+    return results, stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+    import sys
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Generate posts in bulk and plan them in the content calendar.")
+    parser.add_argument("--specs", help="JSON file with a list of {tag, length, language, date} specs")
+    parser.add_argument("--tags", help="comma-separated topics (default: every tag in the few-shot corpus)")
+    parser.add_argument("--start", default=str(date.today()), help="first date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--per-day", type=int, default=1)
+    parser.add_argument("--lengths", default="Medium", help="comma-separated, cycled: Short,Medium,Long")
+    parser.add_argument("--languages", default="English", help="comma-separated, cycled: English,Hinglish")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rpm", type=int, help="Groq requests per minute (default 30, unlimited with --fake)")
+    parser.add_argument("--tpm", type=int, help="Groq tokens per minute (default 6000, unlimited with --fake)")
+    parser.add_argument("--dry-run", action="store_true", help="generate and print, don't store anything")
+    parser.add_argument("--fake", action="store_true",
+                        help="benchmark against a local fake LLM (1s latency, 5%% 429s) with throwaway databases")
+    args = parser.parse_args()
+
+    if args.specs:
+        with open(args.specs, encoding="utf-8") as f:
+            specs = json.load(f)
+    else:
+        if args.tags:
+            tags = [t.strip() for t in args.tags.split(",") if t.strip()]
+        else:
+            from post_gen import get_few_shot
+            tags = get_few_shot().get_tags()
+        specs = plan_specs(tags, args.start, args.days, args.per_day,
+                           args.lengths.split(","), args.languages.split(","))
+
+    model = None
+    default_rpm, default_tpm = 30, 6000
+    if args.fake:
+        import calendar_db
+        import db
+        from fake_llm import FakeChatModel, post_responder
+        model = FakeChatModel(responder=post_responder, latency=1.0, jitter=0.2, error_rate=0.05)
+        default_rpm = default_tpm = 0
+        # never mix fake posts into the real databases
+        tmp = tempfile.mkdtemp()
+        db.DB_FILE = os.path.join(tmp, "posts.db")
+        calendar_db.DB_FILE = os.path.join(tmp, "content_calendar.db")
+    limiter = RateLimiter(default_rpm if args.rpm is None else args.rpm,
+                          default_tpm if args.tpm is None else args.tpm)
+    if not args.fake:
+        # Groq requests are limited (and retried) by the shared client
+        from llm_helper import get_llm_client
+        get_llm_client().limiter = limiter
+
+    def progress(done, total, failed, eta):
+        left = f"ETA {eta:5.0f}s" if eta is not None else "ETA     ?"
+        sys.stderr.write(f"\r{done}/{total} posts ({failed} failed)  {left}")
+        sys.stderr.flush()
+
+    results, stats = generate_bulk(specs, model=model, max_workers=args.workers, limiter=limiter,
+                                   store=not args.dry_run, on_progress=progress)
+    sys.stderr.write("\n")
+    if args.dry_run:
+        for result in results:
+            if result:
+                print(f"--- {result['date']}  {result['tag']} ({result['length']}, {result['language']})")
+                print(result["content"])
+    print(f"Generated {stats['generated']} of {stats['specs']} posts in {stats['seconds']:.1f}s "
+          f"({stats['posts_per_sec']:.2f} posts/s, prompts built in {stats['prompt_seconds']:.2f}s, "
+          f"{stats['retries']} retries), {stats['stored']} stored with calendar entries")
+    if stats["errors"]:
+        index, error = stats["errors"][0]
+        failed_path = "bulk_failed_specs.json"
+        with open(failed_path, "w", encoding="utf-8") as f:
+            json.dump([specs[i] for i, _ in stats["errors"]], f, indent=4)
+        print(f"{len(stats['errors'])} posts failed (first error: {error!r}); "
+              f"retry them with --specs {failed_path}")
+    if args.fake:
+        serial = (stats["specs"] + stats["retries"]) * 1.1
+        print(f"One post at a time would take ~{serial:.0f}s at the fake LLM's 1.1s average latency")
@@ -1,66 +1,119 @@
-import sqlite3
+import storage
 
-# ===== CREATE TABLE IF NOT EXISTS =====
-def init_calendar_db():
-    conn = sqlite3.connect("content_calendar.db")
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS calendar (
+DB_FILE = "content_calendar.db"
+
+# ===== SCHEMA MIGRATIONS (only ever append) =====
+MIGRATIONS = [
+    # 1: calendar table
+    ['''CREATE TABLE IF NOT EXISTS calendar (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     title TEXT NOT NULL,
                     description TEXT,
                     date TEXT NOT NULL,
                     status TEXT DEFAULT 'Planned'
-                )''')
-    conn.commit()
-    conn.close()
+                )'''],
+    # 2: index for the date-ordered listing
+    ["CREATE INDEX IF NOT EXISTS idx_calendar_date ON calendar (date)"],
+    # 3: status-filtered listings in date order
+    ["CREATE INDEX IF NOT EXISTS idx_calendar_status_date ON calendar (status, date)"],
+    # 4: entries planned by bulk_gen.py point at their generated post (posts.db id)
+    ["ALTER TABLE calendar ADD COLUMN post_id INTEGER"],
+]
+
+# ===== CREATE / UPGRADE TABLES (once per process) =====
+def init_calendar_db():
+    storage.migrate(DB_FILE, MIGRATIONS)
 
 # ===== ADD NEW ENTRY =====
 def add_calendar_entry(title, description, date, status="Planned"):
-    conn = sqlite3.connect("content_calendar.db")
-    c = conn.cursor()
-    c.execute("INSERT INTO calendar (title, description, date, status) VALUES (?, ?, ?, ?)",
-              (title, description, date, status))
-    conn.commit()
-    conn.close()
+    return storage.execute(DB_FILE, "INSERT INTO calendar (title, description, date, status) VALUES (?, ?, ?, ?)",
+                           (title, description, date, status)).lastrowid
+
+# ===== ADD MANY ENTRIES (one transaction) =====
+def add_calendar_entries(entries):
+    """entries: iterable of dicts with title, description, date and optional status and post_id"""
+    with storage.transaction(DB_FILE) as conn:
+        return insert_calendar_entries(conn, entries)
+
+def insert_calendar_entries(conn, entries, schema="main"):
+    """
+    add_calendar_entries inside the caller's transaction; schema is the name the
+    calendar database is attached under (see storage.transaction(attach=...)).
+    Returns the number of rows inserted.
+    """
+    rows = [(e["title"], e.get("description"), e["date"], e.get("status", "Planned"), e.get("post_id"))
+            for e in entries]
+    return conn.executemany(f"INSERT INTO {schema}.calendar (title, description, date, status, post_id) "
+                            "VALUES (?, ?, ?, ?, ?)", rows).rowcount
 
 # ===== GET ALL ENTRIES =====
 def get_all_entries():
-    conn = sqlite3.connect("content_calendar.db")
-    c = conn.cursor()
-    c.execute("SELECT * FROM calendar ORDER BY date ASC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    return storage.query(DB_FILE, "SELECT * FROM calendar ORDER BY date ASC")
+
+# ===== PAGINATED ENTRIES =====
+def _entry_filters(status=None, start_date=None, end_date=None):
+    clauses, params = [], []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if start_date:
+        clauses.append("date >= ?")
+        params.append(str(start_date))
+    if end_date:
+        clauses.append("date <= ?")
+        params.append(str(end_date))
+    return clauses, params
+
+def get_entries_page(limit=20, cursor=None, status=None, start_date=None, end_date=None):
+    """
+    One page of entries in date order, using keyset pagination on (date, id).
+    cursor: next_cursor returned for the previous page (None for the first page)
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = _entry_filters(status, start_date, end_date)
+    if cursor:
+        clauses.append("(date, id) > (?, ?)")
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = storage.query(DB_FILE, f"SELECT * FROM calendar {where} ORDER BY date ASC, id ASC LIMIT ?",
+                         (*params, limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][3], rows[-1][0])
+
+def count_entries(status=None, start_date=None, end_date=None):
+    clauses, params = _entry_filters(status, start_date, end_date)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return storage.query_one(DB_FILE, f"SELECT COUNT(*) FROM calendar {where}", params)[0]
 
 # ===== UPDATE STATUS =====
 def update_status(entry_id, new_status):
-    conn = sqlite3.connect("content_calendar.db")
-    c = conn.cursor()
-    c.execute("UPDATE calendar SET status = ? WHERE id = ?", (new_status, entry_id))
-    conn.commit()
-    conn.close()
+    storage.execute(DB_FILE, "UPDATE calendar SET status = ? WHERE id = ?", (new_status, entry_id))
+
+# ===== UPDATE MANY STATUSES (one transaction) =====
+def update_statuses(updates):
+    """updates: iterable of (entry_id, new_status)"""
+    return storage.executemany(DB_FILE, "UPDATE calendar SET status = ? WHERE id = ?",
+                               [(status, entry_id) for entry_id, status in updates])
 
 # ===== DELETE ENTRY =====
 def delete_entry(entry_id):
-    conn = sqlite3.connect("content_calendar.db")
-    c = conn.cursor()
-    c.execute("DELETE FROM calendar WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    storage.execute(DB_FILE, "DELETE FROM calendar WHERE id = ?", (entry_id,))
 
-from calendar_db import init_calendar_db, add_calendar_entry, get_all_entries, update_status, delete_entry
 
-# Initialize database
-init_calendar_db()
+if __name__ == "__main__":
+    # Initialize database
+    init_calendar_db()
 
-# Add sample entries
-add_calendar_entry("Post on LinkedIn AI Agent", "A summary of new LinkedIn AI Agent feature", "2025-08-15")
-add_calendar_entry("Instagram Reel: Self Development", "Quick tips for confidence", "2025-08-16")
+    # Add sample entries
+    add_calendar_entry("Post on LinkedIn AI Agent", "A summary of new LinkedIn AI Agent feature", "2025-08-15")
+    add_calendar_entry("Instagram Reel: Self Development", "Quick tips for confidence", "2025-08-16")
 
-# Show all entries
-print("📅 Content Calendar:")
-for entry in get_all_entries():
-    print(entry)
+    # Show all entries
+    print("📅 Content Calendar:")
+    for entry in get_all_entries():
+        print(entry)
 
-# Update status of first entry
-update_status(1, "Completed")
\ No newline at end of file
+    # Update status of first entry
+    update_status(1, "Completed")
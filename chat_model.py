@@ -0,0 +1,52 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# LangChain chat model on top of llm_client.LLMClient, so chains, the response
+# cache and streaming in preprocess.py / post_gen.py / summarizer.py go through
+# the same connection pool, rate limiter and retries as every other Groq call.
+
+ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def to_openai_messages(messages: List[BaseMessage]) -> List[Dict[str, str]]:
+    return [{"role": getattr(m, "role", None) or ROLES.get(m.type, "user"), "content": m.content} for m in messages]
+
+
+class ClientChatModel(BaseChatModel):
+    """Chat model whose requests are made by an LLMClient (client=...)."""
+
+    client: Any = None
+    model_name: str
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-client"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "temperature": self.temperature, "max_tokens": self.max_tokens}
+
+    def _request(self, messages, stop, kwargs):
+        params = {"stop": stop} if stop else {}
+        return dict(messages=to_openai_messages(messages), model=self.model_name, temperature=self.temperature,
+                    max_tokens=self.max_tokens, **params, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        data = self.client.chat_completion(**self._request(messages, stop, kwargs))
+        message = AIMessage(content=data["choices"][0]["message"]["content"])
+        return ChatResult(generations=[ChatGeneration(message=message)],
+                          llm_output={"token_usage": data.get("usage", {}), "model_name": self.model_name})
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for text in self.client.stream(**self._request(messages, stop, kwargs)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
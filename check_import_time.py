@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# Import-time regression check for the Streamlit app:
+#   python check_import_time.py [--budget MS] [--module main]
+# Runs `python -X importtime -c "import main"` a few times in a scratch directory
+# and fails if importing the app (on top of Streamlit itself, which it cannot
+# avoid) takes longer than BUDGET_MS, or if a heavy dependency that should only
+# load on first use shows up at import time.
+
+BUDGET_MS = 150
+RUNS = 3
+
+# loaded lazily on first use (resources.py getters, function-level imports)
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_groq", "groq", "dotenv", "numpy", "pandas",
+                "bs4", "lxml", "pdfplumber", "pypdfium2", "cryptography")
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr):
+    """[(depth, module, self_us, cumulative_us)] from -X importtime output, in print order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module):
+    """(cumulative ms of module, ms of its streamlit import, rows) for one fresh interpreter."""
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}  # importing must not need the key
+    env["PYTHONPATH"] = REPO + os.pathsep + env.get("PYTHONPATH", "")
+    with tempfile.TemporaryDirectory() as cwd:  # main.py creates its SQLite files in the working directory
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+    total = next(cum for depth, name, _, cum in rows if depth == 0 and name == module)
+    streamlit = sum(cum for depth, name, _, cum in rows if depth == 1 and name == "streamlit")
+    return total / 1000, streamlit / 1000, rows
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fail if importing the app got slower or loads heavy modules.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="ms allowed on top of streamlit")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(RUNS)]
+    total, streamlit, rows = min(runs, key=lambda run: run[0] - run[1])
+    own = total - streamlit
+    print(f"import {args.module}: {total:.0f} ms total, {streamlit:.0f} ms streamlit, "
+          f"{own:.0f} ms own (budget {args.budget:.0f} ms, best of {RUNS})")
+
+    direct = sorted((row for row in rows if row[0] == 1 and row[1] != "streamlit"), key=lambda row: -row[3])
+    for depth, name, _, cum in direct[:8]:
+        print(f"  {cum / 1000:7.1f} ms  {name}")
+
+    eager = sorted({name for _, name, _, _ in rows if name.split(".")[0] in LAZY_MODULES})
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly, should load on first use: {', '.join(n for n in eager if '.' not in n)}")
+        failed = True
+    if own > args.budget:
+        print(f"FAIL: import budget exceeded by {own - args.budget:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
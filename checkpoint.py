@@ -0,0 +1,74 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+# Bump when the metadata prompt changes so old checkpoints are not reused.
+METADATA_VERSION = 1
+
+
+def content_hash(text, version=METADATA_VERSION):
+    """Stable key for a raw post: sha256 of the prompt version and the post text."""
+    data = f"v{version}\0{text}".encode("utf-8", "surrogatepass")
+    return hashlib.sha256(data).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite table of post content hash -> extracted metadata, written as results arrive."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS metadata (
+                                hash TEXT PRIMARY KEY,
+                                metadata TEXT NOT NULL,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                            )''')
+        # tag unification results (tag_unify.py), so later runs only unify new tags
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS tag_map (
+                                tag TEXT PRIMARY KEY,
+                                unified TEXT NOT NULL,
+                                source TEXT NOT NULL,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                            )''')
+        self.conn.commit()
+
+    def get_many(self, hashes):
+        """Return {hash: metadata} for the hashes that are already processed."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            # stay under SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT hash, metadata FROM metadata WHERE hash IN ({','.join('?' * len(chunk))})", chunk)
+                found.update((h, json.loads(m)) for h, m in rows)
+        return found
+
+    def put(self, hash_, metadata):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO metadata (hash, metadata) VALUES (?, ?)",
+                              (hash_, json.dumps(metadata)))
+            self.conn.commit()
+
+    def get_tag_map(self):
+        """{tag: unified tag} for every tag unified so far."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT tag, unified FROM tag_map"))
+
+    def put_tag_map(self, mapping, source):
+        """Store {tag: unified tag}; source records how it was decided ("local" or "llm")."""
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO tag_map (tag, unified, source) VALUES (?, ?, ?)",
+                                  [(tag, unified, source) for tag, unified in mapping.items()])
+            self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
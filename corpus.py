@@ -0,0 +1,208 @@
+import json
+import mmap
+import os
+import numpy as np
+
+# Compiled few-shot corpus.
+# One file: magic, JSON header, then 8-byte aligned column arrays and a utf-8 text blob.
+# The file is mmap'd read-only, so opening it costs nothing up front and every
+# process on the machine shares the same page cache.
+
+MAGIC = b"LIACORP1"
+LENGTHS = ["Short", "Medium", "Long"]
+
+_COLUMNS = [
+    # name, dtype
+    ("engagement", "<i8"),
+    ("line_count", "<i4"),
+    ("language", "<u2"),
+    ("length", "<u1"),
+    ("text_offsets", "<u8"),
+    ("tag_offsets", "<u8"),
+    ("tag_ids", "<u4"),
+    ("index_keys", "<u8"),
+    ("index_offsets", "<u8"),
+    ("index_rows", "<u4"),
+    ("text_blob", "u1"),
+]
+
+
+def corpus_path_for(json_path):
+    """data/processed_posts.json -> data/processed_posts.corpus"""
+    return os.path.splitext(json_path)[0] + ".corpus"
+
+
+def categorize_lengths(line_counts):
+    """Vectorised FewShotPosts.categorize_length: 0 = Short, 1 = Medium, 2 = Long."""
+    line_counts = np.asarray(line_counts)
+    return np.select([line_counts < 5, line_counts <= 10], [0, 1], 2).astype(np.uint8)
+
+
+def _index_key(tag_id, language_id, length_id, n_languages):
+    return (int(tag_id) * n_languages + int(language_id)) * len(LENGTHS) + int(length_id)
+
+
+def compile_corpus(posts):
+    """Encode a list of processed posts (dicts) into the corpus file format."""
+    n = len(posts)
+    languages, tags = {}, {}
+
+    engagement = np.zeros(n, dtype=np.int64)
+    line_count = np.zeros(n, dtype=np.int32)
+    language = np.zeros(n, dtype=np.uint16)
+    text_offsets = np.zeros(n + 1, dtype=np.uint64)
+    tag_offsets = np.zeros(n + 1, dtype=np.uint64)
+    tag_ids, texts = [], []
+
+    pos = 0
+    for i, post in enumerate(posts):
+        encoded = post["text"].encode("utf-8", "surrogatepass")
+        texts.append(encoded)
+        pos += len(encoded)
+        text_offsets[i + 1] = pos
+
+        engagement[i] = post.get("engagement") or 0
+        line_count[i] = post.get("line_count") or 0
+        language[i] = languages.setdefault(post.get("language", ""), len(languages))
+
+        # keep the tag order of the post but drop repeats
+        for tag in dict.fromkeys(post.get("tags", [])):
+            tag_ids.append(tags.setdefault(tag, len(tags)))
+        tag_offsets[i + 1] = len(tag_ids)
+
+    tag_ids = np.array(tag_ids, dtype=np.uint32)
+    length = categorize_lengths(line_count)
+
+    # inverted index: sorted (tag, language, length) keys -> slices of row ids
+    rows = np.repeat(np.arange(n, dtype=np.uint32), np.diff(tag_offsets).astype(np.int64))
+    keys = (tag_ids.astype(np.uint64) * max(len(languages), 1) + language[rows]) * len(LENGTHS) + length[rows]
+    order = np.argsort(keys, kind="stable")
+    keys, rows = keys[order], rows[order]
+    index_keys, starts = np.unique(keys, return_index=True)
+    index_offsets = np.append(starts, len(keys)).astype(np.uint64)
+
+    arrays = {
+        "engagement": engagement,
+        "line_count": line_count,
+        "language": language,
+        "length": length,
+        "text_offsets": text_offsets,
+        "tag_offsets": tag_offsets,
+        "tag_ids": tag_ids,
+        "index_keys": index_keys.astype(np.uint64),
+        "index_offsets": index_offsets,
+        "index_rows": rows,
+        "text_blob": np.frombuffer(b"".join(texts), dtype=np.uint8),
+    }
+
+    header = {
+        "count": n,
+        "languages": list(languages),
+        "tags": list(tags),
+        "columns": {},
+    }
+    # column offsets are relative to the end of the header block
+    body, offset = [], 0
+    for name, dtype in _COLUMNS:
+        data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+        header["columns"][name] = [offset, len(data)]
+        body.append(data)
+        pad = -len(data) % 8
+        body.append(b"\0" * pad)
+        offset += len(data) + pad
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(header_bytes) + 16) % 8)
+    return MAGIC + len(header_bytes).to_bytes(8, "little") + header_bytes + b"".join(body)
+
+
+def write_corpus(posts, path):
+    """Compile posts and write them atomically to path."""
+    data = compile_corpus(posts)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def compile_json(json_path, path=None):
+    """Import a processed_posts.json file into the compiled format."""
+    path = path or corpus_path_for(json_path)
+    with open(json_path, encoding="utf-8") as f:
+        write_corpus(json.load(f), path)
+    return path
+
+
+class Corpus:
+    """Read-only view over a compiled corpus, backed by a file (mmap) or bytes."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:8]) != MAGIC:
+            raise ValueError("Not a compiled few-shot corpus file")
+        header_len = int.from_bytes(view[8:16], "little")
+        header = json.loads(bytes(view[16:16 + header_len]))
+        body = 16 + header_len
+
+        self.count = header["count"]
+        self.languages = header["languages"]
+        self.tags = header["tags"]
+        self._language_ids = {lang: i for i, lang in enumerate(self.languages)}
+        self._tag_ids = {tag: i for i, tag in enumerate(self.tags)}
+
+        for name, dtype in _COLUMNS:
+            offset, size = header["columns"][name]
+            setattr(self, name, np.frombuffer(buffer, dtype=dtype, count=size // np.dtype(dtype).itemsize,
+                                              offset=body + offset))
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_posts(cls, posts):
+        return cls(compile_corpus(posts))
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, tag, language, length):
+        """Row ids of posts with this tag, language and length bucket, in corpus order."""
+        tag_id = self._tag_ids.get(tag)
+        language_id = self._language_ids.get(language)
+        if tag_id is None or language_id is None or length not in LENGTHS:
+            return self.index_rows[:0]
+        key = _index_key(tag_id, language_id, LENGTHS.index(length), max(len(self.languages), 1))
+        i = np.searchsorted(self.index_keys, key)
+        if i == len(self.index_keys) or self.index_keys[i] != key:
+            return self.index_rows[:0]
+        return self.index_rows[self.index_offsets[i]:self.index_offsets[i + 1]]
+
+    def text(self, row_id):
+        start, end = self.text_offsets[row_id], self.text_offsets[row_id + 1]
+        return self.text_blob[start:end].tobytes().decode("utf-8", "surrogatepass")
+
+    def post_tags(self, row_id):
+        start, end = self.tag_offsets[row_id], self.tag_offsets[row_id + 1]
+        return [self.tags[t] for t in self.tag_ids[start:end]]
+
+    def record(self, row_id):
+        """Materialise one post in the same shape as a processed_posts.json entry."""
+        return {
+            "text": self.text(row_id),
+            "engagement": int(self.engagement[row_id]),
+            "line_count": int(self.line_count[row_id]),
+            "language": self.languages[self.language[row_id]],
+            "tags": self.post_tags(row_id),
+            "length": LENGTHS[self.length[row_id]],
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "data/processed_posts.json"
+    out = compile_json(source)
+    print(f"Compiled {len(Corpus.open(out))} posts to {out}")
@@ -1,17 +1,14 @@
-import sqlite3
+import json
+import storage
 
 DB_FILE = "posts.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Agar purana table hai toh delete kar do
-    cursor.execute("DROP TABLE IF EXISTS posts")
 
-    # Naya table create karo with url column
-    cursor.execute("""
-        CREATE TABLE posts (
+# Schema history, one entry per version (see storage.migrate). Only ever append.
+MIGRATIONS = [
+    # 1: posts table (databases created by the old init_db already have it)
+    ["""
+        CREATE TABLE IF NOT EXISTS posts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             content TEXT NOT NULL,
             tag TEXT,
@@ -20,42 +17,208 @@ def init_db():
             url TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-    """)
-    conn.commit()
-    conn.close()
+    """],
+    # 2: indexes for the newest-first listing; filtered listings stay in created_at
+    #    order, so their pages come straight off the index too
+    [
+        "CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_tag_created ON posts (tag, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_language_created ON posts (language, created_at)",
+    ],
+    # 3: parsed résumés from resume_batch.py; one row per distinct file content
+    ["""
+        CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            content_hash TEXT NOT NULL UNIQUE,
+            skills TEXT NOT NULL,
+            experience TEXT NOT NULL,
+            education TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """],
+    # 4: near-duplicate flag and the LSH index behind it (see dedup.py)
+    [
+        "ALTER TABLE posts ADD COLUMN duplicate_of INTEGER",
+        "CREATE TABLE IF NOT EXISTS post_signatures (id INTEGER PRIMARY KEY, signature BLOB NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS post_buckets (bucket INTEGER NOT NULL, id INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_post_buckets ON post_buckets (bucket)",
+    ],
+]
+
+# What save_post/save_posts do with a near-duplicate of a saved post:
+# "flag" stores it with duplicate_of = the original's id, "skip" does not store it.
+ON_DUPLICATE = "flag"
+
+_indexed = False  # posts saved before migration 4 get indexed once per process
+
+
+def init_db():
+    """Apply pending schema migrations. Cheap to call on every Streamlit rerun; data is kept."""
+    global _indexed
+    storage.migrate(DB_FILE, MIGRATIONS)
+    if not _indexed:
+        index_posts()
+        _indexed = True
+
+
+INSERT_POST = '''
+    INSERT INTO posts (content, tag, length, language, url, duplicate_of)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+
+def insert_posts(conn, posts, on_duplicate=ON_DUPLICATE):
+    """
+    Insert posts (dicts) through the near-duplicate index, inside the caller's
+    transaction on posts.db (storage.transaction(DB_FILE)); returns (ids, rows inserted).
+    """
+    from dedup import add_signature, find_duplicate, minhash_many
+
+    ids, inserted = [], 0
+    for p, signature in zip(posts, minhash_many([p["content"] for p in posts])):
+        match = find_duplicate(conn, signature, "post")
+        if match and on_duplicate == "skip":
+            ids.append(match[0])
+            continue
+        post_id = conn.execute(INSERT_POST, (p["content"], p.get("tag"), p.get("length"), p.get("language"),
+                                             p.get("url"), match[0] if match else None)).lastrowid
+        # only originals are indexed, so a popular post doesn't grow its buckets
+        if not match:
+            add_signature(conn, post_id, signature, "post")
+        ids.append(post_id)
+        inserted += 1
+    return ids, inserted
+
+
+def save_post(content, tag, length, language, url=None, on_duplicate=ON_DUPLICATE):
+    """
+    Insert one post and return its id.
+    A near-duplicate of a saved post is flagged (duplicate_of) or, with
+    on_duplicate="skip", not stored; then the original's id is returned.
+    """
+    post = {"content": content, "tag": tag, "length": length, "language": language, "url": url}
+    with storage.transaction(DB_FILE) as conn:
+        return insert_posts(conn, [post], on_duplicate)[0][0]
 
 
-def save_post(content, tag, length, language, url=None):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO posts (content, tag, length, language, url)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (content, tag, length, language, url))
-    conn.commit()
-    conn.close()
+def save_posts(posts, on_duplicate=ON_DUPLICATE, return_ids=False):
+    """
+    Insert many posts in a single transaction, with the same duplicate handling as save_post.
+    posts: iterable of dicts with content, tag, length, language and optional url
+    Returns the number of rows inserted, or with return_ids the id of each post (as save_post).
+    """
+    with storage.transaction(DB_FILE) as conn:
+        ids, inserted = insert_posts(conn, list(posts), on_duplicate)
+    return ids if return_ids else inserted
+
+
+def get_duplicate_of(post_id):
+    """Id of the saved post that post_id nearly duplicates, or None."""
+    row = storage.query_one(DB_FILE, "SELECT duplicate_of FROM posts WHERE id = ?", (post_id,))
+    return row[0] if row else None
+
+
+def index_posts(batch=1000):
+    """
+    Add posts saved before near-duplicate detection existed to the index, flagging
+    the ones that duplicate an earlier post. Returns the number of posts indexed.
+    """
+    pending_sql = '''SELECT id, content FROM posts
+                     WHERE duplicate_of IS NULL AND id NOT IN (SELECT id FROM post_signatures)
+                     ORDER BY id LIMIT ?'''
+    done = 0
+    while True:
+        rows = storage.query(DB_FILE, pending_sql, (batch,))
+        if not rows:
+            return done
+        from dedup import add_signature, find_duplicate, minhash_many
+
+        with storage.transaction(DB_FILE) as conn:
+            for (post_id, _), signature in zip(rows, minhash_many([content for _, content in rows])):
+                match = find_duplicate(conn, signature, "post")
+                if match and match[0] < post_id:
+                    conn.execute("UPDATE posts SET duplicate_of = ? WHERE id = ?", (match[0], post_id))
+                else:
+                    add_signature(conn, post_id, signature, "post")
+        done += len(rows)
 
 
 def get_all_posts():
     """Fetch all posts from the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    return storage.query(DB_FILE, "SELECT * FROM posts ORDER BY created_at DESC")
+
+
+def _post_filters(tag=None, language=None, since=None, until=None):
+    """WHERE clauses + params shared by get_posts_page and count_posts. Dates are 'YYYY-MM-DD', inclusive."""
+    clauses, params = [], []
+    if tag:
+        clauses.append("tag = ?")
+        params.append(tag)
+    if language:
+        clauses.append("language = ?")
+        params.append(language)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(str(since))
+    if until:
+        clauses.append("created_at < date(?, '+1 day')")
+        params.append(str(until))
+    return clauses, params
+
 
-    cursor.execute("SELECT * FROM posts ORDER BY created_at DESC")
-    rows = cursor.fetchall()
+def get_posts_page(limit=20, cursor=None, tag=None, language=None, since=None, until=None):
+    """
+    One page of posts, newest first, using keyset pagination on (created_at, id).
+    cursor: next_cursor returned for the previous page (None for the first page)
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    clauses, params = _post_filters(tag, language, since, until)
+    if cursor:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = storage.query(DB_FILE, f"SELECT * FROM posts {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                         (*params, limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][6], rows[-1][0])
 
-    conn.close()
-    return rows
+
+def count_posts(tag=None, language=None, since=None, until=None):
+    clauses, params = _post_filters(tag, language, since, until)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return storage.query_one(DB_FILE, f"SELECT COUNT(*) FROM posts {where}", params)[0]
+
+
+INSERT_PROFILE = '''
+    INSERT OR IGNORE INTO profiles (source, content_hash, skills, experience, education)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def save_profiles(profiles):
+    """
+    Insert parsed résumés in a single transaction; files already stored (same content hash) are skipped.
+    profiles: iterable of dicts with source, content_hash, skills, experience and education lists
+    Returns the number of rows inserted.
+    """
+    rows = [(p["source"], p["content_hash"], json.dumps(p["skills"]), json.dumps(p["experience"]),
+             json.dumps(p["education"])) for p in profiles]
+    return storage.executemany(DB_FILE, INSERT_PROFILE, rows)
+
+
+def count_profiles():
+    return storage.query_one(DB_FILE, "SELECT COUNT(*) FROM profiles")[0]
 
 
 def delete_all_posts():
     """Delete all posts (use carefully)."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute("DELETE FROM posts")
-    conn.commit()
-    conn.close()
+    with storage.transaction(DB_FILE) as conn:
+        conn.execute("DELETE FROM posts")
+        conn.execute("DELETE FROM post_signatures")
+        conn.execute("DELETE FROM post_buckets")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+import os
+import re
+import sqlite3
+import tempfile
+import zlib
+import numpy as np
+
+# Near-duplicate detection for posts (regenerated posts, copied influencer content).
+# Each text gets a MinHash signature over its word 3-shingles; LSH splits the
+# signature into BANDS bands, and two texts become candidates when any band is
+# identical, so a lookup touches only a few buckets instead of every post.
+# Candidates are confirmed by the fraction of matching signature values (an
+# estimate of their Jaccard similarity). Buckets and signatures live in SQLite
+# (posts.db for saved posts, a scratch file for a raw corpus), so memory stays
+# flat however many posts are indexed.
+
+NUM_PERM = 64
+BANDS = 16          # 16 bands x 4 rows: pairs at Jaccard 0.75 become candidates with p > 0.99
+SHINGLE = 3
+THRESHOLD = 0.75    # edited copies: a couple of words changed in a 80-word post is ~0.86
+BATCH = 1000
+
+_WORD = re.compile(r"\w+")
+_rng = np.random.default_rng(20240901)
+# multiply-shift hash family: h_i(x) = (a_i * x + b_i) mod 2^64, top 32 bits
+_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, k=SHINGLE):
+    """
+    crc32 hashes of the distinct k-word shingles of text (lowercased, punctuation ignored).
+    A text without words (emoji or punctuation only) hashes as a whole, so it only
+    matches exact copies rather than every other text without words.
+    """
+    words = _WORD.findall(text.lower())
+    if words:
+        grams = [" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))]
+    else:
+        grams = ["\0" + text.strip()]  # can't collide with a shingle, which has no NUL
+    return np.unique(np.array([zlib.crc32(g.encode("utf-8", "surrogatepass")) for g in grams], dtype=np.uint64))
+
+
+def minhash_many(texts):
+    """MinHash signatures (len(texts) x NUM_PERM uint32) of many texts at once."""
+    sets = [shingles(text) for text in texts]
+    if not sets:
+        return np.zeros((0, NUM_PERM), dtype=np.uint32)
+    lengths = np.array([len(s) for s in sets])
+    hashed = (np.concatenate(sets)[:, None] * _A + _B) >> np.uint64(32)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(hashed, starts, axis=0).astype(np.uint32)
+
+
+def minhash(text):
+    return minhash_many([text])[0]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_keys(signature):
+    """One bucket key per band, as SQLite integers; the band number is in the low byte."""
+    rows = signature.reshape(BANDS, -1).astype(np.uint64)
+    key = np.zeros(BANDS, dtype=np.uint64)
+    for column in rows.T:
+        key = (key ^ column) * np.uint64(0x100000001B3)  # FNV-1a style mixing of the band's values
+    key = (key >> np.uint64(9)) << np.uint64(8) | np.arange(BANDS, dtype=np.uint64)
+    return [int(k) for k in key]
+
+
+def schema(prefix):
+    """Tables for an LSH index: {prefix}_signatures (id -> signature) and {prefix}_buckets (bucket -> ids)."""
+    return [
+        f"CREATE TABLE IF NOT EXISTS {prefix}_signatures (id INTEGER PRIMARY KEY, signature BLOB NOT NULL)",
+        f"CREATE TABLE IF NOT EXISTS {prefix}_buckets (bucket INTEGER NOT NULL, id INTEGER NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS idx_{prefix}_buckets ON {prefix}_buckets (bucket)",
+    ]
+
+
+def find_duplicate(conn, signature, prefix, threshold=THRESHOLD):
+    """(id, similarity) of the most similar indexed text at or above threshold, or None."""
+    keys = band_keys(signature)
+    rows = conn.execute(f'''SELECT DISTINCT s.id, s.signature FROM {prefix}_buckets b
+                            JOIN {prefix}_signatures s ON s.id = b.id
+                            WHERE b.bucket IN ({",".join("?" * len(keys))})''', keys).fetchall()
+    best = None
+    for id_, blob in rows:
+        score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+        if score >= threshold and (best is None or score > best[1]):
+            best = (id_, score)
+    return best
+
+
+def add_signature(conn, id_, signature, prefix):
+    """Index a text under id_ so later lookups find it."""
+    conn.execute(f"INSERT OR REPLACE INTO {prefix}_signatures (id, signature) VALUES (?, ?)",
+                 (id_, signature.astype(np.uint32).tobytes()))
+    conn.executemany(f"INSERT INTO {prefix}_buckets (bucket, id) VALUES (?, ?)",
+                     [(key, id_) for key in band_keys(signature)])
+
+
+class DuplicateIndex:
+    """
+    Standalone LSH index in its own SQLite file, e.g. to dedupe a raw corpus.
+    Only first occurrences are indexed; a near-duplicate points at the text it copies.
+    """
+
+    def __init__(self, path, threshold=THRESHOLD, prefix="lsh"):
+        self.threshold = threshold
+        self.prefix = prefix
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")   # scratch data, rebuilt on failure
+        self.conn.execute("PRAGMA cache_size=-32000")  # 32 MB, whatever the index size
+        for statement in schema(prefix):
+            self.conn.execute(statement)
+        self.conn.commit()
+        self._next_id = self.conn.execute(f"SELECT COALESCE(MAX(id), -1) + 1 FROM {prefix}_signatures").fetchone()[0]
+
+    def add_many(self, texts):
+        """
+        Check texts in order against the index (and each other) and index the new ones.
+        Returns, per text, None if it is new, else the id of the indexed text it duplicates.
+        Ids are assigned in order, starting after the highest id already indexed.
+        """
+        results = []
+        for start in range(0, len(texts), BATCH):
+            signatures = minhash_many(texts[start:start + BATCH])
+            with self.conn:
+                for signature in signatures:
+                    match = find_duplicate(self.conn, signature, self.prefix, self.threshold)
+                    if match:
+                        results.append(match[0])
+                    else:
+                        add_signature(self.conn, self._next_id, signature, self.prefix)
+                        results.append(None)
+                    self._next_id += 1
+        return results
+
+    def close(self):
+        self.conn.close()
+
+
+def find_duplicates(texts, threshold=THRESHOLD):
+    """
+    For each text, None if it is the first of its kind, else the index of the
+    earlier text it nearly duplicates. Uses a scratch index on disk.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DuplicateIndex(os.path.join(tmp, "dedup.db"), threshold)
+        try:
+            return index.add_many(list(texts))
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    # Benchmark: python dedup.py [n_posts]
+    # n synthetic posts, 10% of them edited copies (a few words changed) of earlier
+    # ones; reports throughput, recall/precision of the flags and peak memory as the
+    # index grows. Compare: an all-pairs check is n^2/2 similarity computations.
+    import resource
+    import sys
+    import time
+
+    # texts without words are compared as a whole, not all flagged as one another's copies
+    assert find_duplicates(["🚀🚀🚀", "🎉🎉", "...", "🚀🚀🚀", "!!!"]) == [None, None, None, 0, None]
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = np.random.default_rng(7)
+    vocab = np.array([f"word{i}" for i in range(50000)])
+
+    def batches():
+        recent = []  # (position, text) of the last 10000 originals, as a ring buffer
+        for start in range(0, n, 10000):
+            texts, truth = [], []
+            for i in range(start, min(start + 10000, n)):
+                if recent and rng.random() < 0.1:
+                    original, text = recent[int(rng.integers(0, len(recent)))]
+                    words = text.split()
+                    for pos in rng.integers(0, len(words), 2):
+                        words[pos] = vocab[rng.integers(0, len(vocab))]
+                    texts.append(" ".join(words))
+                    truth.append(original)
+                else:
+                    text = " ".join(vocab[rng.integers(0, len(vocab), 80)])
+                    if len(recent) < 10000:
+                        recent.append((i, text))
+                    else:
+                        recent[i % 10000] = (i, text)
+                    texts.append(text)
+                    truth.append(None)
+            yield texts, truth
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DuplicateIndex(os.path.join(tmp, "bench.db"))
+        found = correct = expected = done = 0
+        start = time.perf_counter()
+        for texts, truth in batches():
+            results = index.add_many(texts)
+            done += len(texts)
+            expected += sum(t is not None for t in truth)
+            found += sum(r is not None for r in results)
+            correct += sum(r is not None and r == t for r, t in zip(results, truth))
+            if done % 50000 == 0 or done == n:
+                elapsed = time.perf_counter() - start
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print(f"{done:>9} posts  {done / elapsed:8.0f} posts/s  peak RSS {peak:6.0f} MB  "
+                      f"index {os.path.getsize(os.path.join(tmp, 'bench.db')) / 1e6:6.0f} MB")
+        index.close()
+    print(f"near-duplicates: {expected} planted, {found} flagged, {correct} pointing at the right original "
+          f"(recall {correct / max(expected, 1):.3f}, precision {correct / max(found, 1):.3f})")
@@ -0,0 +1,94 @@
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Local stand-in for the Groq chat model, for load tests and benchmarks without an API key.
+
+
+class FakeLLMError(Exception):
+    """Injected API failure carrying an HTTP status like the real clients do."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Fake LLM error {status_code}")
+        self.status_code = status_code
+
+
+def preprocess_responder(messages):
+    """Answer preprocess.py prompts (metadata extraction, tag unification) with plausible JSON."""
+    text = messages[-1].content
+    if "Here is the list of tags:" in text:
+        tags = text.split("Here is the list of tags:")[1].strip().split(",")
+        return json.dumps({tag.strip(): tag.strip().title() for tag in tags if tag.strip()})
+    post = text.split("perform this task:")[-1].strip()
+    return json.dumps({"line_count": post.count("\n") + 1, "language": "English", "tags": ["Motivation"]})
+
+
+def post_responder(messages):
+    """Answer post_gen.py prompts with a post of the requested length about the topic."""
+    text = messages[-1].content
+    topic = text.split("1) Topic:")[-1].split("\n")[0].strip()
+    lines = int(text.split("2) Length:")[-1].split()[0]) if "2) Length:" in text else 3
+    return "\n".join(f"Line {i + 1} of a post about {topic}." for i in range(lines + 2))
+
+
+def summary_responder(messages):
+    """Answer summarizer.py prompts with bullets made of the first words of each paragraph."""
+    text = messages[-1].content.split(":\n\n", 1)[-1]
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    return "\n".join("- " + " ".join(p.lstrip("- ").split()[:8]) for p in paragraphs[:5])
+
+
+def echo_responder(messages):
+    return "Fake response: " + messages[-1].content[:80]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with configurable latency and failure rate.
+    latency: seconds per call (plus up to `jitter` extra)
+    token_latency: seconds between streamed chunks
+    error_rate: probability that a call raises FakeLLMError(error_status)
+    """
+
+    responder: Callable[[List[BaseMessage]], str] = echo_responder
+    latency: float = 0.0
+    jitter: float = 0.0
+    token_latency: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    calls: int = 0
+
+    _lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _call_start(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.error_rate:
+            raise FakeLLMError(self.error_status)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._call_start()
+        message = AIMessage(content=self.responder(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._call_start()
+        for i, token in enumerate(self.responder(messages).split(" ")):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token if i == 0 else " " + token))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
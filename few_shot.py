@@ -1,35 +1,115 @@
-import pandas as pd
+import numpy as np
 import json
 import os
+from corpus import LENGTHS, Corpus, compile_json, corpus_path_for
+from vector_index import VectorIndex, vectors_path_for, write_index
 
 
 class FewShotPosts:
     def __init__(self, file_path="data/processed_posts.json"):
-        self.df = None
-        self.unique_tags = None
+        self._corpus = None
+        self._index = None
 
         # Make file_path relative to this file
         base_dir = os.path.dirname(__file__)
-        full_path = os.path.join(base_dir, file_path)
+        self.file_path = os.path.join(base_dir, file_path)
 
-        self.load_posts(full_path)
+    @property
+    def corpus(self):
+        # opened on first use, so constructing FewShotPosts is free
+        if self._corpus is None:
+            self.load_posts(self.file_path)
+        return self._corpus
+
+    @property
+    def index(self):
+        # similarity index, opened (or built) the first time a free-text lookup needs it
+        if self._index is None:
+            self.load_index()
+        return self._index
 
     def load_posts(self, file_path):
-        with open(file_path, encoding="utf-8") as f:
-            posts = json.load(f)
-            self.df = pd.json_normalize(posts)
-            self.df['length'] = self.df['line_count'].apply(self.categorize_length)
-            # collect unique tags
-            all_tags = self.df['tags'].apply(lambda x: x).sum()
-            self.unique_tags = list(set(all_tags))
-
-    def get_filtered_posts(self, length, language, tag):
-        df_filtered = self.df[
-            (self.df['tags'].apply(lambda tags: tag in tags)) &
-            (self.df['language'] == language) &
-            (self.df['length'] == length)
-            ]
-        return df_filtered.to_dict(orient='records')
+        """
+        Open the compiled corpus next to file_path, or import file_path itself
+        when it is JSON (compiling it for next time if the .corpus is missing or stale).
+        """
+        compiled_path = file_path if file_path.endswith(".corpus") else corpus_path_for(file_path)
+        if os.path.exists(compiled_path) and (
+                compiled_path == file_path or os.path.getmtime(compiled_path) >= os.path.getmtime(file_path)):
+            self._corpus = Corpus.open(compiled_path)
+            return
+
+        try:
+            self._corpus = Corpus.open(compile_json(file_path, compiled_path))
+        except OSError:
+            # read-only deployment: import in memory
+            with open(file_path, encoding="utf-8") as f:
+                self._corpus = Corpus.from_posts(json.load(f))
+
+    def load_index(self):
+        """
+        Open the vector index next to the corpus, rebuilding it from the corpus
+        texts when it is missing, stale or built for a different corpus.
+        """
+        corpus = self.corpus
+        path = vectors_path_for(self.file_path)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(self.file_path):
+            index = VectorIndex.open(path)
+            if len(index) == len(corpus):
+                self._index = index
+                return
+
+        texts = [corpus.text(row_id) for row_id in range(len(corpus))]
+        try:
+            self._index = VectorIndex.open(write_index(texts, path))
+        except OSError:
+            # read-only deployment: build in memory
+            self._index = VectorIndex.from_texts(texts)
+
+    def get_filtered_posts(self, length, language, tag, limit=None, by_engagement=False):
+        """
+        Return posts matching tag, language and length.
+        limit: return at most this many posts
+        by_engagement: highest engagement first instead of corpus order
+        """
+        ids = self.corpus.lookup(tag, language, length)
+        if len(ids) == 0 or (limit is not None and limit <= 0):
+            return []
+
+        if by_engagement:
+            scores = -self.corpus.engagement[ids]
+            if limit is not None and limit < len(ids):
+                # only the top `limit` ids get fully sorted
+                top = np.argpartition(scores, limit - 1)[:limit]
+                ids = ids[top[np.argsort(scores[top], kind="stable")]]
+            else:
+                ids = ids[np.argsort(scores, kind="stable")]
+        elif limit is not None:
+            ids = ids[:limit]
+
+        return [self.corpus.record(row_id) for row_id in ids]
+
+    def get_similar_posts(self, text, language=None, length=None, limit=2):
+        """
+        Return the posts most similar to free text (a topic, or a whole profile prompt), best first.
+        language: only posts in this language
+        length: among the closest matches, posts of this length come first
+        """
+        return self.get_similar_posts_many([text], language, length, limit)[0]
+
+    def get_similar_posts_many(self, texts, language=None, length=None, limit=2):
+        """get_similar_posts for many texts with one index search; a list of results per text."""
+        corpus = self.corpus
+        where = None
+        if language is not None:
+            language_id = corpus.languages.index(language) if language in corpus.languages else -1
+            where = lambda rows: corpus.language[rows] == language_id
+        results = []
+        for rows, _ in self.index.search_many(texts, k=limit * 4, where=where):
+            if length in LENGTHS:
+                rows = rows[np.argsort(corpus.length[rows] != LENGTHS.index(length), kind="stable")]
+            results.append([corpus.record(row_id) for row_id in rows[:limit]])
+        return results
 
     def categorize_length(self, line_count):
         if line_count < 5:
@@ -40,10 +120,11 @@ class FewShotPosts:
             return "Long"
 
     def get_tags(self):
-        return self.unique_tags
+        return list(self.corpus.tags)
 
 
 if __name__ == "__main__":
     fs = FewShotPosts()
     posts = fs.get_filtered_posts("Medium", "Hinglish", "Job Search")
     print(posts)
+    print(fs.get_similar_posts("looking for my first job after college", "English", "Short"))
@@ -0,0 +1,211 @@
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+# On-disk cache of fetched pages for fetcher.FetchEngine.
+# Pages are revalidated with ETag / Last-Modified, Cache-Control max-age is
+# honoured, and the text extracted from a page is cached next to it, so a
+# fresh hit or a 304 never re-parses the HTML.
+# A streamed read that stopped early (scraper.stream_visible_text) caches only
+# the text it extracted: the page is marked truncated, and any other extraction
+# of it fetches the full page again instead of parsing the cut-off HTML.
+
+CACHE_FILE = "http_cache.db"
+MAX_BYTES = 200 * 1024 * 1024
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+def parse_cache_control(value):
+    """Return (store, max_age seconds) for a Cache-Control header value."""
+    value = (value or "").lower()
+    if "no-store" in value:
+        return False, 0
+    if "no-cache" in value:
+        return True, 0
+    match = _MAX_AGE.search(value)
+    return True, int(match.group(1)) if match else 0
+
+
+class HTTPCache:
+    """
+    max_bytes: least recently used pages are evicted once compressed pages and
+    extracted texts together take more than this
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS pages (
+                                url TEXT PRIMARY KEY,
+                                etag TEXT,
+                                last_modified TEXT,
+                                fetched_at REAL NOT NULL,
+                                max_age INTEGER NOT NULL,
+                                body BLOB NOT NULL,
+                                size INTEGER NOT NULL,
+                                accessed_at REAL NOT NULL,
+                                truncated INTEGER NOT NULL DEFAULT 0
+                            )''')
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(pages)")]
+        if "truncated" not in columns:
+            # caches from before the flag may hold cut-off bodies: treat them all as truncated
+            self.conn.execute("ALTER TABLE pages ADD COLUMN truncated INTEGER NOT NULL DEFAULT 1")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS extracted (
+                                url TEXT NOT NULL,
+                                kind TEXT NOT NULL,
+                                text TEXT NOT NULL,
+                                PRIMARY KEY (url, kind)
+                            )''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+        self.conn.commit()
+
+    def fetch_text(self, url, kind, extract, get, load=None):
+        """
+        Text of url as produced by extract(html), fetched with get(url, headers=...).
+        kind names the extractor, so different extractions of one page are cached separately.
+        load(response) -> (html, text, truncated) reads a streamed response instead of resp.text.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.conn.execute("SELECT etag, last_modified, fetched_at, max_age, truncated FROM pages "
+                                      "WHERE url = ?", (url,)).fetchone()
+            if entry and entry[4] and self.conn.execute("SELECT 1 FROM extracted WHERE url = ? AND kind = ?",
+                                                        (url, kind)).fetchone() is None:
+                # only a prefix of the page is cached, and not extracted this way: fetch it in full
+                entry = None
+            fresh = entry is not None and now < entry[2] + entry[3]
+            if fresh:
+                self.hits += 1
+
+        if fresh:
+            return self._cached_text(url, kind, extract, now)
+
+        headers = {}
+        if entry and entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry and entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+        resp = get(url, headers=headers, stream=load is not None)
+
+        store, max_age = parse_cache_control(resp.headers.get("Cache-Control"))
+        if resp.status_code == 304 and entry:
+            resp.close()
+            with self._lock:
+                self.revalidated += 1
+                self.conn.execute("UPDATE pages SET fetched_at = ?, max_age = ? WHERE url = ?", (now, max_age, url))
+                self.conn.commit()
+            return self._cached_text(url, kind, extract, now)
+
+        with resp:  # a streamed response is also closed if the status or the body fails
+            resp.raise_for_status()
+            with self._lock:
+                self.misses += 1
+            html, text, truncated = load(resp) if load else (resp.text, extract(resp.text), False)
+        if store and (resp.headers.get("ETag") or resp.headers.get("Last-Modified") or max_age):
+            self._store(url, resp.headers, html, max_age, kind, text, now, truncated)
+        return text
+
+    def _cached_text(self, url, kind, extract, now):
+        with self._lock:
+            self.conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+            row = self.conn.execute("SELECT text FROM extracted WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+            if row is None:
+                body = self.conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()[0]
+            self.conn.commit()
+        if row is not None:
+            return row[0]
+        # page is cached, but not yet extracted this way
+        text = extract(zlib.decompress(body).decode("utf-8", "surrogatepass"))
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO extracted (url, kind, text) VALUES (?, ?, ?)", (url, kind, text))
+            self.conn.execute("UPDATE pages SET size = size + ? WHERE url = ?", (len(text), url))
+            self.conn.commit()
+        return text
+
+    def _store(self, url, headers, html, max_age, kind, text, now, truncated=False):
+        body = zlib.compress(html.encode("utf-8", "surrogatepass"))
+        with self._lock:
+            self.conn.execute("DELETE FROM extracted WHERE url = ?", (url,))
+            self.conn.execute('''INSERT OR REPLACE INTO pages
+                                    (url, etag, last_modified, fetched_at, max_age, body, size, accessed_at, truncated)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                              (url, headers.get("ETag"), headers.get("Last-Modified"), now, max_age,
+                               body, len(body) + len(text), now, int(truncated)))
+            self.conn.execute("INSERT INTO extracted (url, kind, text) VALUES (?, ?, ?)", (url, kind, text))
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM pages ORDER BY accessed_at ASC").fetchall():
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.conn.execute("DELETE FROM extracted WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            pages, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "pages": pages, "bytes": size}
+
+
+if __name__ == "__main__":
+    # Check: a long page streamed at a small text limit, then asked for in full or
+    # extracted another way, must not come from the cut-off HTML cached the first time.
+    import os
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from fetcher import FetchEngine
+    from scraper import extract_visible_text, stream_visible_text
+
+    page = ("<html><body>" + "".join(f"<p>Paragraph {i} " + "word " * 40 + "</p>" for i in range(500))
+            + "</body></html>").encode()
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.headers.get("If-None-Match"))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "max-age=3600")
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/long"
+    engine = FetchEngine(cache=HTTPCache(os.path.join(tempfile.mkdtemp(), "cache.db")))
+
+    def fetch(max_chars):
+        return engine.fetch_text(url, f"visible_text:{max_chars}", lambda html: extract_visible_text(html)[:max_chars],
+                                 load=lambda resp: stream_visible_text(resp, max_chars=max_chars))
+
+    full = extract_visible_text(page.decode())
+    small = fetch(2000)
+    large = fetch(200000)
+    again = fetch(2000)
+    other = engine.fetch_text(url, "paragraphs", lambda html: str(html.count("<p>")))
+    assert len(small) == 2000, len(small)
+    assert large == full, (len(large), len(full))
+    assert again == small and len(requests_seen) == 2, requests_seen  # full page cached now: a fresh hit
+    assert other == "500", other
+    print(f"ok: {len(small)} chars at the small limit, then all {len(large)} chars; "
+          f"{len(requests_seen)} requests, cache {engine.cache.stats()}")
+    server.shutdown()
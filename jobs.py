@@ -0,0 +1,378 @@
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+import storage
+
+# Background jobs for the Streamlit app: the script submits a job and returns at
+# once, a pool of worker threads runs it, and the tabs poll the jobs table for
+# progress and results. The queue lives in jobs.db (pooled WAL SQLite, see
+# storage.py), so job ids stay valid across reruns and sessions, results are
+# kept after the session that asked for them is gone, and several jobs per
+# session run side by side.
+# Threads, not processes: jobs wait on the LLM API and HTTP, and the one CPU-heavy
+# step (PDF parsing) already fans out to its own process pool.
+# Uploaded files are not stored in the table (every poll would read them back):
+# submit(files=...) writes them to UPLOADS_DIR next to jobs.db, the task gets
+# their paths, and they are deleted once the job has finished.
+
+DB_FILE = "jobs.db"
+MAX_WORKERS = 4
+POLL_SECONDS = 1.0          # idle workers also check for jobs submitted by other processes
+PARTIAL_INTERVAL = 0.25     # streamed partial results are written at most this often
+KEEP_DAYS = 7               # finished jobs older than this are purged at startup
+UPLOADS_DIR = "job_uploads"  # per-job directories of uploaded files, next to the database
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+# ===== SCHEMA MIGRATIONS (only ever append) =====
+MIGRATIONS = [
+    # 1: jobs table; times are unix seconds so the UI can show elapsed time
+    ['''CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    owner TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    args TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    progress REAL,
+                    message TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )''',
+     "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)",
+     "CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created_at)"],
+]
+
+COLUMNS = ("id", "kind", "owner", "status", "args", "result", "error", "progress", "message",
+           "cancel_requested", "created_at", "started_at", "finished_at")
+# list_jobs() is polled every second: leave out the arguments
+LIST_COLUMNS = tuple(column for column in COLUMNS if column != "args")
+
+_tasks = {}
+
+
+def task(kind):
+    """
+    Decorator: register fn as the task run for jobs of this kind.
+    fn(job, **args) gets a Job for progress, partial results and cancellation and
+    returns a JSON-serialisable result.
+    """
+    def register(fn):
+        _tasks[kind] = fn
+        return fn
+    return register
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check_cancelled() so a task stops at a convenient point."""
+
+
+class Job:
+    """Handle passed to a running task."""
+
+    def __init__(self, queue, job_id, kind, args):
+        self.queue = queue
+        self.id = job_id
+        self.kind = kind
+        self.args = args
+        self._partial_at = 0.0
+
+    def progress(self, fraction=None, message=None):
+        """Report progress: fraction in [0, 1] and/or a short status message."""
+        storage.execute(self.queue.path, "UPDATE jobs SET progress = COALESCE(?, progress), "
+                                         "message = COALESCE(?, message) WHERE id = ?",
+                        (fraction, message, self.id))
+
+    def partial(self, result, force=False):
+        """Store a partial result (e.g. the text streamed so far), throttled to PARTIAL_INTERVAL."""
+        now = time.monotonic()
+        if force or now - self._partial_at >= PARTIAL_INTERVAL:
+            self._partial_at = now
+            storage.execute(self.queue.path, "UPDATE jobs SET result = ? WHERE id = ?",
+                            (json.dumps(result), self.id))
+
+    def cancelled(self):
+        return self.queue.cancel_requested(self.id)
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled()
+
+
+def _row_to_dict(row, columns=COLUMNS):
+    job = dict(zip(columns, row))
+    if "args" in job:
+        job["args"] = json.loads(job["args"])
+    job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a pool of worker threads.
+    submit() returns a job id at once; get()/list_jobs() poll status, progress and
+    result; cancel() drops a queued job or asks a running one to stop.
+    """
+
+    def __init__(self, path=DB_FILE, max_workers=MAX_WORKERS):
+        self.path = path
+        self.uploads_dir = os.path.join(os.path.dirname(os.path.abspath(path)), UPLOADS_DIR)
+        self.worker_id = str(os.getpid())
+        storage.migrate(path, MIGRATIONS)
+        self._recover()
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _recover(self):
+        """Fail jobs left running by a process that is gone, purge old finished jobs and leftover uploads."""
+        with storage.transaction(self.path) as conn:
+            for job_id, worker in conn.execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall():
+                if not (worker and worker.isdigit() and _process_alive(int(worker))) or worker == self.worker_id:
+                    conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                                 (FAILED, "interrupted by a restart", time.time(), job_id))
+            conn.execute("DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?",
+                         (*ACTIVE, time.time() - KEEP_DAYS * 86400))
+            active = {row[0] for row in conn.execute("SELECT id FROM jobs WHERE status IN (?, ?)", ACTIVE)}
+        if os.path.isdir(self.uploads_dir):
+            for job_id in os.listdir(self.uploads_dir):
+                # skip fresh directories: another process may be submitting that job right now
+                job_dir = os.path.join(self.uploads_dir, job_id)
+                if job_id not in active and os.path.getmtime(job_dir) < time.time() - 3600:
+                    self._remove_uploads(job_id)
+
+    def _remove_uploads(self, job_id):
+        shutil.rmtree(os.path.join(self.uploads_dir, job_id), ignore_errors=True)
+
+    # ===== SUBMIT / POLL / CANCEL =====
+    def submit(self, kind, owner=None, files=None, **args):
+        """
+        Queue a job of a registered kind; returns its id.
+        files: {arg name: bytes}, saved under uploads_dir; the task gets the file's path
+        as that argument, and the file is deleted when the job has finished
+        """
+        if kind not in _tasks:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        if files:
+            job_dir = os.path.join(self.uploads_dir, job_id)
+            os.makedirs(job_dir)
+            for name, data in files.items():
+                args[name] = os.path.join(job_dir, name)
+                with open(args[name], "wb") as f:
+                    f.write(data)
+        storage.execute(self.path, "INSERT INTO jobs (id, kind, owner, args, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (job_id, kind, owner, json.dumps(args), time.time()))
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """The job as a dict (args, status, progress, message, result, error, times), or None."""
+        row = storage.query_one(self.path, f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_dict(row) if row else None
+
+    def list_jobs(self, owner=None, kind=None, limit=20):
+        """Newest jobs first (without their args), optionally only one owner's and/or one kind."""
+        clauses, params = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = storage.query(self.path, f"SELECT {', '.join(LIST_COLUMNS)} FROM jobs {where} "
+                                        f"ORDER BY created_at DESC LIMIT ?", (*params, limit))
+        return [_row_to_dict(row, LIST_COLUMNS) for row in rows]
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job, or ask a running one to stop (its task sees
+        job.cancelled(); whatever it returns afterwards is dropped).
+        Returns False if the job had already finished.
+        """
+        with storage.transaction(self.path) as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                                  (CANCELLED, time.time(), job_id, QUEUED))
+            if not cursor.rowcount:
+                return conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                                    (job_id, RUNNING)).rowcount > 0
+        self._remove_uploads(job_id)
+        return True
+
+    def cancel_requested(self, job_id):
+        row = storage.query_one(self.path, "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        return bool(row and row[0])
+
+    def wait(self, job_id, timeout=None, interval=0.05):
+        """Block until the job has finished (or timeout seconds pass); returns the job."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] not in ACTIVE:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(interval)
+
+    # ===== WORKERS =====
+    def _claim(self):
+        """Mark the oldest queued job as running by this process and return it, or None."""
+        with storage.transaction(self.path) as conn:
+            row = conn.execute("SELECT id, kind, args FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                               (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+                         (RUNNING, self.worker_id, time.time(), row[0]))
+        return row[0], row[1], json.loads(row[2])
+
+    def _finish(self, job_id, status, result=None, error=None):
+        # a job cancelled while running ends as cancelled whatever the task returned
+        storage.execute(self.path, '''UPDATE jobs SET
+                                          status = CASE WHEN cancel_requested THEN ? ELSE ? END,
+                                          progress = CASE WHEN cancel_requested THEN progress
+                                                          ELSE COALESCE(?, progress) END,
+                                          result = COALESCE(?, result), error = ?, finished_at = ?
+                                      WHERE id = ? AND status = ?''',
+                        (CANCELLED, status, 1.0 if status == DONE else None,
+                         None if result is None else json.dumps(result), error, time.time(), job_id, RUNNING))
+
+    def _run(self, job_id, kind, args):
+        fn = _tasks.get(kind)
+        if fn is None:
+            self._finish(job_id, FAILED, error=f"No task registered for {kind}")
+            self._remove_uploads(job_id)
+            return
+        try:
+            result = fn(Job(self, job_id, kind, args), **args)
+        except JobCancelled:
+            self._finish(job_id, CANCELLED)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job_id, FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job_id, DONE, result=result)
+        finally:
+            self._remove_uploads(job_id)
+
+    def _work(self):
+        while not self._stopping:
+            try:
+                claimed = self._claim()
+            except Exception:
+                traceback.print_exc()
+                claimed = None
+            if claimed is None:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(POLL_SECONDS)
+                continue
+            self._run(*claimed)
+
+    def stats(self):
+        """{status: number of jobs}."""
+        return dict(storage.query(self.path, "SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def close(self):
+        """Stop the workers once their current jobs are done."""
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    The process-wide queue, started on first use. Not a resources.shared resource:
+    "Reload resources" must not drop a queue that still has jobs running.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+if __name__ == "__main__":
+    # Benchmark: python jobs.py [n_jobs]
+    # n LLM-bound jobs (fake LLM, 0.5s per call) submitted from one "script run":
+    # how long submitting blocks the caller, how long until all results are in,
+    # and what cancelling a queued and a running job does.
+    import sys
+    import tempfile
+    from fake_llm import FakeChatModel
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    model = FakeChatModel(latency=0.5)
+
+    @task("echo")
+    def echo(job, text, steps=1):
+        for step in range(steps):
+            job.check_cancelled()
+            answer = model.invoke(text).content
+            job.progress((step + 1) / steps, f"step {step + 1}/{steps}")
+        return answer
+
+    queue = JobQueue(os.path.join(tempfile.mkdtemp(), "jobs.db"), max_workers=8)
+    start = time.perf_counter()
+    ids = [queue.submit("echo", owner="bench", text=f"job {i}") for i in range(n)]
+    submitted = time.perf_counter() - start
+    polls = 0
+    while any(job["status"] in ACTIVE for job in queue.list_jobs(owner="bench", limit=n)):
+        polls += 1
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    print(f"{n} jobs: submitting took {submitted * 1000:.1f} ms in total ({submitted / n * 1000:.2f} ms per job), "
+          f"all done after {elapsed:.2f}s ({polls} polls); one at a time: ~{n * 0.5:.0f}s")
+
+    long_job = queue.submit("echo", owner="bench", text="long", steps=20)
+    queued = [queue.submit("echo", owner="bench", text="filler", steps=4) for _ in range(8)]
+    time.sleep(0.7)
+    queue.cancel(long_job)
+    queue.cancel(queued[-1])
+    print("cancel running job:", queue.wait(long_job)["status"], "after", queue.get(long_job)["message"])
+    print("cancel queued job: ", queue.get(queued[-1])["status"])
+
+    # uploads live next to the database, not in the polled table, and go away with the job
+    @task("upload_size")
+    def upload_size(job, data):
+        with open(data, "rb") as f:
+            return len(f.read())
+
+    upload_job = queue.submit("upload_size", owner="bench", files={"data": b"%PDF" * 250000})
+    print("upload job:         ", queue.wait(upload_job)["result"], "bytes read from",
+          queue.get(upload_job)["args"]["data"])
+    assert not os.path.exists(os.path.join(queue.uploads_dir, upload_job))
+    assert all("args" not in job for job in queue.list_jobs(owner="bench"))
+    queue.close()
+    print("totals:", queue.stats())
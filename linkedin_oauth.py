@@ -1,19 +1,288 @@
+import json
 import os
+import sqlite3
+import threading
+import time
 import requests
+from cryptography.fernet import Fernet
+from singleflight import SingleFlight
 
 CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
 CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("LINKEDIN_REDIRECT_URI")
+TOKEN_URL = os.getenv("LINKEDIN_TOKEN_URL", "https://www.linkedin.com/oauth/v2/accessToken")
 
-def get_access_token(auth_code: str) -> str:
-    url = "https://www.linkedin.com/oauth/v2/accessToken"
-    params = {
+# Tokens are kept in TOKEN_DB, encrypted with the Fernet key in LINKEDIN_TOKEN_KEY
+# (or KEY_FILE, created on first use), and cached in memory after the first read.
+TOKEN_DB = "linkedin_tokens.db"
+KEY_FILE = "linkedin_tokens.key"
+REFRESH_MARGIN = 300  # refresh this many seconds before the access token expires
+REFRESH_RETRY = 60  # wait this long after a failed background refresh before trying again
+TIMEOUT = (5, 15)
+
+
+class TokenExpiredError(Exception):
+    """No valid access token and no refresh token to get one; the user has to sign in again."""
+
+
+def _post_token(params):
+    response = requests.post(TOKEN_URL, data={**params, 'client_id': CLIENT_ID, 'client_secret': CLIENT_SECRET},
+                             timeout=TIMEOUT)
+    response.raise_for_status()
+    token = response.json()
+    # store absolute times; LinkedIn only sends lifetimes in seconds
+    now = time.time()
+    token["expires_at"] = now + token.get("expires_in", 0)
+    if "refresh_token_expires_in" in token:
+        token["refresh_token_expires_at"] = now + token["refresh_token_expires_in"]
+    return token
+
+
+def exchange_code(auth_code: str) -> dict:
+    """Trade an authorization code for a token dict (access_token, expires_at, refresh_token...)."""
+    return _post_token({
         'grant_type': 'authorization_code',
         'code': auth_code,
-        'redirect_uri': REDIRECT_URI,
-        'client_id': CLIENT_ID,
-        'client_secret': CLIENT_SECRET
-    }
-    response = requests.post(url, data=params)
-    response.raise_for_status()
-    return response.json()['access_token']
+        'redirect_uri': REDIRECT_URI
+    })
+
+
+def refresh_access_token(refresh_token: str) -> dict:
+    return _post_token({
+        'grant_type': 'refresh_token',
+        'refresh_token': refresh_token
+    })
+
+
+def _load_key(path=KEY_FILE):
+    key = os.getenv("LINKEDIN_TOKEN_KEY")
+    if key:
+        return key.encode()
+    if not os.path.exists(path):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(Fernet.generate_key())
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+
+class TokenStore:
+    """SQLite table of account -> Fernet-encrypted token JSON."""
+
+    def __init__(self, path=TOKEN_DB, key=None):
+        self.fernet = Fernet(key or _load_key())
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS tokens (
+                                account TEXT PRIMARY KEY,
+                                token BLOB NOT NULL,
+                                updated_at REAL NOT NULL
+                            )''')
+        self.conn.commit()
+
+    def load(self, account):
+        with self._lock:
+            row = self.conn.execute("SELECT token FROM tokens WHERE account = ?", (account,)).fetchone()
+        return json.loads(self.fernet.decrypt(row[0])) if row else None
+
+    def save(self, account, token):
+        data = self.fernet.encrypt(json.dumps(token).encode())
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO tokens (account, token, updated_at) VALUES (?, ?, ?)",
+                              (account, data, time.time()))
+            self.conn.commit()
+
+    def delete(self, account):
+        with self._lock:
+            self.conn.execute("DELETE FROM tokens WHERE account = ?", (account,))
+            self.conn.commit()
+
+
+class TokenManager:
+    """
+    Valid access tokens per account, served from memory.
+    Within refresh_margin of expiry the current token is still returned and a
+    refresh runs in the background; an expired token is refreshed before
+    returning. Concurrent refreshes of one account share a single request, and
+    after a failed background refresh the next one waits refresh_retry seconds.
+    """
+
+    def __init__(self, store=None, refresh_margin=REFRESH_MARGIN, refresh=refresh_access_token,
+                 refresh_retry=REFRESH_RETRY):
+        self._store = store
+        self.refresh_margin = refresh_margin
+        self.refresh_retry = refresh_retry
+        self._refresh = refresh
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._background = set()
+        self._failed = {}  # account -> time of the last failed background refresh
+
+    @property
+    def store(self):
+        # opened on first use, so importing this module never touches the key file
+        if self._store is None:
+            self._store = TokenStore()
+        return self._store
+
+    def set_token(self, token, account="default"):
+        self.store.save(account, token)
+        with self._lock:
+            self._tokens[account] = token
+            self._failed.pop(account, None)
+
+    def login(self, auth_code, account="default"):
+        """Complete the OAuth redirect: exchange the code and keep the token. Returns the access token."""
+        token = exchange_code(auth_code)
+        self.set_token(token, account)
+        return token["access_token"]
+
+    def logout(self, account="default"):
+        self.store.delete(account)
+        with self._lock:
+            self._tokens.pop(account, None)
+
+    def _cached(self, account):
+        with self._lock:
+            token = self._tokens.get(account)
+        if token is None:
+            token = self.store.load(account)
+            if token is not None:
+                with self._lock:
+                    self._tokens[account] = token
+        return token
+
+    def get_token(self, account="default"):
+        token = self._cached(account)
+        if token is None:
+            raise TokenExpiredError(f"No LinkedIn token for {account!r}; sign in first.")
+        remaining = token["expires_at"] - time.time()
+        if remaining > self.refresh_margin:
+            return token["access_token"]
+        if remaining > 0:
+            # still valid: hand it out now and renew it off the request path
+            with self._lock:
+                failed_at = self._failed.get(account)
+                start = account not in self._background and \
+                    (failed_at is None or time.time() - failed_at >= self.refresh_retry)
+                if start:
+                    self._background.add(account)
+            if start:
+                threading.Thread(target=self._refresh_quietly, args=(account,), daemon=True).start()
+            return token["access_token"]
+        return self.refresh(account)["access_token"]
+
+    def refresh(self, account="default"):
+        """
+        Refresh the account's token unless it is still outside the refresh margin
+        (deduplicated across threads) and return the current token dict.
+        """
+        def do_refresh():
+            token = self._cached(account)
+            # another caller may have refreshed it while we waited
+            if token and token["expires_at"] - time.time() > self.refresh_margin:
+                return token
+            if not token or not token.get("refresh_token") or \
+                    token.get("refresh_token_expires_at", float("inf")) <= time.time():
+                raise TokenExpiredError(f"LinkedIn token for {account!r} expired; sign in again.")
+            try:
+                new = self._refresh(token["refresh_token"])
+            except requests.HTTPError as e:
+                # 400/401: LinkedIn rejected the refresh token (revoked or expired)
+                if e.response is not None and e.response.status_code in (400, 401):
+                    raise TokenExpiredError(f"LinkedIn refused to refresh the token for {account!r}; "
+                                            f"sign in again.") from e
+                raise
+            # LinkedIn does not always return a new refresh token
+            new.setdefault("refresh_token", token["refresh_token"])
+            if "refresh_token_expires_at" in token:
+                new.setdefault("refresh_token_expires_at", token["refresh_token_expires_at"])
+            self.set_token(new, account)
+            return new
+        return self._flight.do(account, do_refresh)
+
+    def _refresh_quietly(self, account):
+        try:
+            self.refresh(account)
+        except Exception:
+            # the token is still valid for now; try again after refresh_retry,
+            # and the next get_token after expiry retries and raises
+            with self._lock:
+                self._failed[account] = time.time()
+        finally:
+            with self._lock:
+                self._background.discard(account)
+
+
+token_manager = TokenManager()
+
+
+def get_access_token(auth_code: str) -> str:
+    """Exchange the authorization code and store the token (with expiry and refresh token)."""
+    return token_manager.login(auth_code)
+
+
+if __name__ == "__main__":
+    # Benchmark: cached get_token vs. a token exchange per call, and 50 threads
+    # hitting an expired token at once (one refresh request is made).
+    import tempfile
+
+    calls = []
+
+    def fake_refresh(refresh_token):
+        calls.append(refresh_token)
+        time.sleep(0.2)  # typical token endpoint round trip
+        return {"access_token": f"access-{len(calls)}", "expires_at": time.time() + 3600}
+
+    store = TokenStore(os.path.join(tempfile.mkdtemp(), "tokens.db"), key=Fernet.generate_key())
+    manager = TokenManager(store, refresh=fake_refresh)
+    manager.set_token({"access_token": "access-0", "refresh_token": "r", "expires_at": time.time() + 3600})
+
+    n = 100000
+    start = time.perf_counter()
+    for _ in range(n):
+        manager.get_token()
+    print(f"cached get_token:      {(time.perf_counter() - start) / n * 1e6:8.2f} µs per call")
+    print(f"token exchange:        {200000:8.0f} µs per call (simulated round trip)")
+
+    manager.set_token({"access_token": "access-0", "refresh_token": "r", "expires_at": time.time() - 1})
+    threads = [threading.Thread(target=manager.get_token) for _ in range(50)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"50 threads, expired:   {(time.perf_counter() - start) * 1000:8.0f} ms, "
+          f"{len(calls)} refresh request(s), token now {manager.get_token()}")
+    manager.set_token({"access_token": "access-1", "refresh_token": "r", "expires_at": time.time() + 60})
+    print(f"expiring in 60s:       returns {manager.get_token()} at once, refreshing in the background")
+    time.sleep(0.3)
+    print(f"                       then {manager.get_token()} ({len(calls)} refresh requests in total)")
+    print(f"encrypted at rest:     {store.conn.execute('SELECT token FROM tokens').fetchone()[0][:40]!r}...")
+
+    # a failing background refresh is not retried on every call
+    failures = []
+
+    def failing_refresh(refresh_token):
+        failures.append(refresh_token)
+        response = requests.Response()
+        response.status_code = 400
+        raise requests.HTTPError("400 Client Error: invalid_grant", response=response)
+
+    manager = TokenManager(store, refresh=failing_refresh)
+    manager.set_token({"access_token": "access-0", "refresh_token": "r", "expires_at": time.time() + 60})
+    for _ in range(200):
+        assert manager.get_token() == "access-0"
+        time.sleep(0.005)
+    assert len(failures) == 1, len(failures)
+    print(f"failing refresh:       {len(failures)} request in 200 calls over 1s, next try in {manager.refresh_retry}s")
+
+    # a refresh token LinkedIn rejects means signing in again
+    manager.set_token({"access_token": "access-0", "refresh_token": "r", "expires_at": time.time() - 1})
+    try:
+        manager.get_token()
+        raise AssertionError("expected TokenExpiredError")
+    except TokenExpiredError as e:
+        print(f"rejected refresh:      TokenExpiredError({e})")
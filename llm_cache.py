@@ -0,0 +1,167 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import warnings
+import weakref
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from singleflight import SingleFlight, StreamFlight
+
+CACHE_FILE = "llm_cache.db"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(value):
+    """Collapse whitespace in every string so prompts that differ only in indentation share an entry."""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    return value
+
+
+def make_key(model, params, messages):
+    """
+    Cache key for a chat request: model, sampling params and normalized messages.
+    messages: OpenAI-style message dicts, or LangChain's serialized prompt string
+    """
+    if isinstance(messages, str):
+        try:
+            messages = json.loads(messages)
+        except ValueError:
+            pass
+    payload = json.dumps([model, params, normalize(messages)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ResponseCache(BaseCache):
+    """
+    SQLite cache of LLM responses.
+    ttl: seconds an entry stays valid
+    max_entries: least recently used entries beyond this are evicted
+
+    Works as a LangChain cache (ClientChatModel(cache=...)) and, through cached_chat,
+    for raw OpenAI-style chat completion calls.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=24 * 3600, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.inflight = SingleFlight()
+        self.inflight_streams = StreamFlight()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                value TEXT NOT NULL,
+                                created_at REAL NOT NULL,
+                                accessed_at REAL NOT NULL
+                            )''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+        # also closed once the last holder drops the cache (see resources.invalidate)
+        self._finalizer = weakref.finalize(self, self.conn.close)
+
+    # ----- generic key/value API -----
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                              "VALUES (?, ?, ?, ?)", (key, value, now, now))
+            self.conn.execute('''DELETE FROM responses WHERE key IN (
+                                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                                )''', (self.max_entries,))
+            self.conn.commit()
+
+    def cached_chat(self, model, messages, params, create):
+        """
+        Return the cached text for this chat request, or call create() and cache its result.
+        Identical requests that miss at the same time share a single create() call.
+        """
+        key = make_key(model, params, messages)
+        value = self.get(key)
+        if value is None:
+            def create_and_store():
+                result = create()
+                self.set(key, result)
+                return result
+            value = self.inflight.do(key, create_and_store)
+        return value
+
+    def stream_chat(self, model, messages, params, create_stream):
+        """
+        Streaming version of cached_chat: yield text chunks from create_stream(),
+        or the whole cached text at once. Only a fully received answer is cached.
+        Identical streams that miss at the same time share a single create_stream().
+        """
+        key = make_key(model, params, messages)
+        value = self.get(key)
+        if value is not None:
+            yield value
+            return
+
+        def stream_and_store():
+            parts = []
+            for chunk in create_stream():
+                parts.append(chunk)
+                yield chunk
+            self.set(key, "".join(parts))
+
+        yield from self.inflight_streams.stream(key, stream_and_store)
+
+    def close(self):
+        with self._lock:
+            self._finalizer()
+
+    def stats(self):
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    # ----- LangChain BaseCache -----
+    def lookup(self, prompt, llm_string):
+        value = self.get(make_key(llm_string, None, prompt))
+        if value is None:
+            return None
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            return loads(value)
+
+    def update(self, prompt, llm_string, return_val):
+        self.set(make_key(llm_string, None, prompt), dumps(list(return_val)))
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
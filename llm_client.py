@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limit import RateLimiter, call_with_retry, estimate_tokens
+
+# One client for every Groq chat call (LangChain models via chat_model.py, the
+# raw calls in main.py). Requests go over a pooled keep-alive session, wait on
+# one process-wide rate limiter and concurrency cap, and are retried with
+# backoff on 429/5xx. GROQ_BASE_URL points it at any OpenAI-compatible server,
+# e.g. llm_stub.py.
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 60
+MAX_CONCURRENCY = 8
+RETRIES = 5
+
+
+class LLMAPIError(Exception):
+    """Error response from the chat completions API; status_code/response feed rate_limit's retry logic."""
+
+    def __init__(self, status_code, message, response=None):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.response = response
+
+
+def _error_message(response):
+    try:
+        return response.json()["error"]["message"]
+    except Exception:
+        return response.text[:200]
+
+
+def _close(executor, session):
+    executor.shutdown(wait=False)
+    session.close()
+
+
+class LLMClient:
+    """
+    Chat completions over a pooled session, with sync (chat), streaming (stream)
+    and asyncio (achat, astream) methods sharing the same limits.
+    limiter: RateLimiter for requests/tokens per minute (RateLimiter(0, 0) disables it)
+    max_concurrency: requests in flight at once, across all threads and event loops
+    """
+
+    def __init__(self, api_key, base_url=GROQ_BASE_URL, limiter=None, max_concurrency=MAX_CONCURRENCY,
+                 retries=RETRIES, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.limiter = limiter or RateLimiter()
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._stats = {"requests": 0, "retries": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        # also closed once the last holder drops the client (see resources.invalidate)
+        self._finalizer = weakref.finalize(self, _close, self._executor, self.session)
+
+    def _count(self, **deltas):
+        with self._lock:
+            for field, delta in deltas.items():
+                self._stats[field] += delta
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _payload(self, messages, model, temperature, max_tokens, stream, params):
+        payload = {"model": model, "messages": messages, **params}
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _post(self, payload):
+        """POST with retries; returns the response while holding a concurrency slot (release it after reading)."""
+        tokens = estimate_tokens(json.dumps(payload["messages"]), payload.get("max_tokens") or 256)
+
+        def attempt():
+            self.limiter.acquire(tokens)
+            self._slots.acquire()
+            self._count(requests=1)
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout,
+                                             stream=payload.get("stream", False))
+            except requests.Timeout as e:
+                self._slots.release()
+                raise TimeoutError(str(e)) from e
+            except requests.ConnectionError as e:
+                self._slots.release()
+                raise ConnectionError(str(e)) from e
+            except BaseException:
+                self._slots.release()
+                raise
+            if response.status_code >= 400:
+                message = _error_message(response)
+                response.close()
+                self._slots.release()
+                raise LLMAPIError(response.status_code, message, response)
+            return response
+
+        def on_retry(error, attempt_number):
+            self._count(retries=1)
+
+        try:
+            return call_with_retry(attempt, retries=self.retries, on_retry=on_retry)
+        except Exception:
+            self._count(errors=1)
+            raise
+
+    def chat_completion(self, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None, **params):
+        """The API's JSON response for a list of {"role", "content"} messages."""
+        response = self._post(self._payload(messages, model, temperature, max_tokens, False, params))
+        try:
+            data = response.json()
+        finally:
+            self._slots.release()
+        usage = data.get("usage") or {}
+        self._count(prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0))
+        return data
+
+    def chat(self, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None, **params):
+        """The answer text."""
+        data = self.chat_completion(messages, model, temperature, max_tokens, **params)
+        return data["choices"][0]["message"]["content"]
+
+    def stream(self, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None, **params):
+        """
+        Yield the answer as text chunks as they arrive (server-sent events).
+        Only opening the stream is retried; the concurrency slot is held until it ends.
+        """
+        response = self._post(self._payload(messages, model, temperature, max_tokens, True, params))
+        try:
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    continue  # read to the end, so the connection goes back to the pool
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+        finally:
+            response.close()
+            self._slots.release()
+
+    async def achat(self, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None, **params):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          lambda: self.chat(messages, model, temperature, max_tokens, **params))
+
+    async def astream(self, messages, model=DEFAULT_MODEL, temperature=None, max_tokens=None, **params):
+        loop = asyncio.get_running_loop()
+        chunks = self.stream(messages, model, temperature, max_tokens, **params)
+        done = object()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(self._executor, next, chunks, done)
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+
+    def close(self):
+        self._finalizer()
+
+
+if __name__ == "__main__":
+    # Benchmark against llm_stub.py (20ms per response, 5% 429s in the last run):
+    # a new connection per call (the old requests.post in main.py) vs. the pooled
+    # client, then concurrent async calls through the shared concurrency cap.
+    import time
+    from concurrent.futures import ThreadPoolExecutor as Pool
+    from llm_stub import serve
+
+    n = 200
+    messages = [{"role": "user", "content": "What is trending in AI this week?"}]
+    unlimited = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    def report(label, seconds, stub, client=None):
+        extra = f", {client.stats()['retries']} retries" if client else ""
+        print(f"{label:<32} {seconds * 1000:7.0f} ms  {n / seconds:7.1f} req/s  "
+              f"{stub.connections:4d} connections, peak {stub.max_active} in flight{extra}")
+
+    stub = serve(latency=0.02)
+    start = time.perf_counter()
+    for _ in range(n):
+        requests.post(stub.url + "/chat/completions", json={"model": DEFAULT_MODEL, "messages": messages},
+                      headers={"Authorization": "Bearer stub"}).raise_for_status()
+    report("requests.post per call", time.perf_counter() - start, stub)
+    stub.shutdown()
+
+    stub = serve(latency=0.02)
+    client = LLMClient("stub", stub.url, limiter=unlimited)
+    start = time.perf_counter()
+    for _ in range(n):
+        client.chat(messages)
+    report("LLMClient.chat, serial", time.perf_counter() - start, stub)
+    stub.shutdown()
+
+    stub = serve(latency=0.02)
+    client = LLMClient("stub", stub.url, limiter=unlimited)
+    start = time.perf_counter()
+    with Pool(max_workers=32) as pool:
+        list(pool.map(lambda _: client.chat(messages), range(n)))
+    report("LLMClient.chat, 32 threads", time.perf_counter() - start, stub)
+    stub.shutdown()
+
+    async def gather(client):
+        return await asyncio.gather(*(client.achat(messages) for _ in range(n)))
+
+    stub = serve(latency=0.02, error_rate=0.05)
+    client = LLMClient("stub", stub.url, limiter=unlimited)
+    start = time.perf_counter()
+    answers = asyncio.run(gather(client))
+    report("LLMClient.achat x200, 5% 429s", time.perf_counter() - start, stub, client)
+    assert len(answers) == n and all(answers)
+    stub.shutdown()
+
+    stub = serve(latency=0.02, token_latency=0.01)
+    client = LLMClient("stub", stub.url, limiter=unlimited)
+    start = time.perf_counter()
+    chunks = client.stream(messages)
+    next(chunks)
+    first = time.perf_counter() - start
+    rest = "".join(chunks)
+    print(f"stream: first chunk after {first * 1000:.0f} ms, complete after "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms ({len(rest.split())} more words)")
+    stub.shutdown()
@@ -1,23 +1,128 @@
-from langchain_groq import ChatGroq
 import os
-from dotenv import load_dotenv
+from resources import shared
+from singleflight import SingleFlight, StreamFlight
 
-# Load .env file
-load_dotenv()
+# LLM clients are built on first use (see resources.py): importing this module
+# loads neither langchain nor the HTTP client, and a missing GROQ_API_KEY only
+# fails the first call that needs it. All of them send their requests through
+# the shared LLMClient (llm_client.py).
 
-# Get the API key
-api_key = os.getenv("GROQ_API_KEY")
-if not api_key:
-    raise ValueError("GROQ_API_KEY environment variable not found! Please set it in your .env or Streamlit Secrets.")
+MODEL_NAME = "llama-3.1-8b-instant"
+
+# Requests currently waiting on Groq, keyed like the cache
+llm_flight = SingleFlight()
+llm_stream_flight = StreamFlight()
+
+
+def get_api_key():
+    from dotenv import load_dotenv
+
+    # Load .env file
+    load_dotenv()
+    # Get the API key
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable not found! Please set it in your .env or Streamlit Secrets.")
+    return api_key
+
+
+@shared
+def get_response_cache():
+    """Shared on-disk cache for repeated prompts (all modules + raw client calls in main.py)"""
+    from llm_cache import ResponseCache
+    return ResponseCache()
+
+
+@shared
+def get_llm_client():
+    """The one LLMClient (connection pool, rate limiter, retries) behind every Groq call"""
+    api_key = get_api_key()  # loads .env first, which may also set GROQ_BASE_URL
+    from llm_client import LLMClient
+    return LLMClient(api_key=api_key)
+
+
+@shared(depends_on=(get_llm_client, get_response_cache))
+def get_llm():
+    """The chat model, with the response cache and coalescing of identical concurrent requests."""
+    from langchain_core.load import dumps
+    from chat_model import ClientChatModel
+    from llm_cache import make_key
+
+    class CoalescingChatModel(ClientChatModel):
+        """Chat model where identical concurrent requests (e.g. from several Streamlit sessions) share one API call."""
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            key = make_key(self._get_llm_string(stop=stop, **kwargs), None, dumps(messages))
+            generate = super()._generate
+            return llm_flight.do(key, lambda: generate(messages, stop=stop, run_manager=run_manager, **kwargs))
+
+    return CoalescingChatModel(
+        client=get_llm_client(),
+        model_name=MODEL_NAME,
+        cache=get_response_cache()
+    )
+
+
+@shared(depends_on=(get_llm_client,))
+def get_llm_uncached():
+    """Same model without the cache, for calls that should sample a fresh answer every time"""
+    from chat_model import ClientChatModel
+    return ClientChatModel(
+        client=get_llm_client(),
+        model_name=MODEL_NAME,
+        cache=False
+    )
+
+
+_LAZY = {"llm": get_llm, "llm_uncached": get_llm_uncached, "response_cache": get_response_cache}
+
+
+def __getattr__(name):
+    # llm_helper.llm etc. still work, built on first access
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def stream_text(model, prompt):
+    """
+    Yield the model's answer as text chunks as they arrive.
+    Uses the same cache entries as model.invoke(prompt): a cached answer is yielded
+    in one piece, and a fresh one is cached once the stream completes. With a cache,
+    identical concurrent streams share one request and all get its chunks.
+    """
+    from langchain_core.load import dumps
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration
+    from llm_cache import ResponseCache, make_key
+
+    messages = [HumanMessage(content=prompt)] if isinstance(prompt, str) else prompt
+    cache = model.cache if isinstance(model.cache, ResponseCache) else None
+    if cache is None:
+        # uncached models sample a fresh answer for every caller
+        for chunk in model.stream(messages):
+            yield chunk.content
+        return
+
+    cache_prompt, llm_string = dumps(messages), model._get_llm_string()
+    cached = cache.lookup(cache_prompt, llm_string)
+    if cached:
+        yield cached[0].text
+        return
+
+    def stream_and_store():
+        parts = []
+        for chunk in model.stream(messages):
+            parts.append(chunk.content)
+            yield chunk.content
+        cache.update(cache_prompt, llm_string, [ChatGeneration(message=AIMessage(content="".join(parts)))])
+
+    yield from llm_stream_flight.stream(make_key(llm_string, None, cache_prompt), stream_and_store)
 
-# Initialize the LLM
-llm = ChatGroq(
-    groq_api_key=api_key,
-    model_name="llama-3.1-8b-instant"
-)
 
 # Optional: simple test if run directly
 if __name__ == "__main__":
     user_input = input("Enter your question: ")
-    response = llm.invoke(user_input)
+    response = get_llm().invoke(user_input)
     print(response.content)
+    print(get_response_cache().stats())
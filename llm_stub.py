@@ -0,0 +1,136 @@
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local OpenAI-compatible chat completions server (the API Groq exposes), for
+# testing and load-benchmarking llm_client.py without an API key:
+#   python llm_stub.py --port 8001 --latency 0.2 --error-rate 0.05
+#   GROQ_BASE_URL=http://127.0.0.1:8001/openai/v1 GROQ_API_KEY=stub streamlit run main.py
+# Supports streamed (SSE) and plain responses, latency and 429 injection, and
+# counts requests, TCP connections and peak concurrency.
+
+
+def echo_responder(messages):
+    return "Stub response: " + messages[-1]["content"][:80]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, token_latency=0.0, error_rate=0.0, responder=echo_responder):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.responder = responder
+        self.requests = 0
+        self.connections = 0
+        self.errors = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def count(self, field, delta=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+            self.max_active = max(self.max_active, self.active)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count("connections")
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if not self.path.endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+        server.count("requests")
+        server.count("active")
+        try:
+            time.sleep(server.latency)
+            if random.random() < server.error_rate:
+                server.count("errors")
+                return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                                       [("Retry-After", "0")])
+            text = server.responder(payload["messages"])
+            model = payload.get("model", "stub")
+            if not payload.get("stream"):
+                usage = {"prompt_tokens": sum(len(m["content"]) // 4 + 1 for m in payload["messages"]),
+                         "completion_tokens": len(text) // 4 + 1}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                return self._send_json(200, {
+                    "id": "chatcmpl-stub", "object": "chat.completion", "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, token in enumerate(text.split(" ")):
+                time.sleep(server.token_latency)
+                delta = {"content": token if i == 0 else " " + token}
+                event = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        finally:
+            server.count("active", -1)
+
+
+def serve(port=0, **options):
+    """Start a StubServer on 127.0.0.1 in a background thread; options as for StubServer. Call .shutdown() to stop."""
+    server = StubServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible chat completions stub.")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response starts")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", args.port), args.latency, args.token_latency, args.error_rate)
+    print(f"serving on {server.url} (GROQ_BASE_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,14 @@
 import streamlit as st
-import pdfplumber #extracting text from PDF
-from few_shot import FewShotPosts
-from post_gen import generate_post
-from db import init_db, save_post, get_all_posts
-from utils import summarize_url
-from calendar_db import init_calendar_db, add_calendar_entry, get_all_entries, update_status
-import requests
-import os
+from profile_parser import parse_profile_pdf #extracting text from PDF
+from post_gen import generate_post_stream, get_few_shot
+from llm_helper import get_llm_client, get_response_cache
+import resources
+from db import init_db, save_post, save_posts, get_posts_page, count_posts, get_duplicate_of
+from utils import summarize_url, summarize_urls
+from calendar_db import init_calendar_db, add_calendar_entry, get_entries_page, count_entries, update_status
+from jobs import ACTIVE, DONE, FAILED, QUEUED, RUNNING, get_job_queue, task
+import time
+import uuid
 
 # ----------------- Initialization -----------------
 init_db() #stores posts
@@ -16,66 +18,10 @@ init_calendar_db()  #content calender
 #This function takes a PDF file, reads the text, and splits it into different sections like skills, experience, and
 # education.
 #It uses keyword matching to detect which section the text belongs to, cleans the data, and returns it in a structured
-# dictionary format.
+# dictionary format. Parsing lives in profile_parser.py, which caches results per file content.
 def extract_profile_data_from_pdf(file) -> dict:
     try:
-        with pdfplumber.open(file) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        skills, experience, education = [], [], []
-        current_section = None
-        for line in lines:
-            low = line.lower()
-            if any(h in low for h in ["skill", "skills", "technical skills", "core skills"]):
-                current_section = "skills"
-                continue
-            if any(h in low for h in ["experience", "work experience", "professional experience", "intern"]):
-                current_section = "experience"
-                continue
-            if any(h in low for h in ["education", "academic", "qualification", "degree", "bachelor", "master", "college", "university"]):
-                current_section = "education"
-                continue
-            if current_section is None:
-                if any(k in low for k in ["company", "inc", "ltd", "pvt", "intern", "internship", "worked", "project"]):
-                    current_section = "experience"
-                elif any(k in low for k in ["bachelor", "master", "b.sc", "b.tech", "bachelor's", "university", "college", "graduat"]):
-                    current_section = "education"
-                elif ("," in line and len(line.split()) <= 12) or any(k in low for k in ["python", "java", "excel", "sql", "machine learning", "ml"]):
-                    current_section = "skills"
-            if current_section == "skills":
-                skills.append(line)
-            elif current_section == "experience":
-                experience.append(line)
-            elif current_section == "education":
-                education.append(line)
-        parsed_skills = []
-        for s in skills:
-            if "," in s:
-                parts = [p.strip() for p in s.split(",") if p.strip()]
-                parsed_skills.extend(parts)
-            else:
-                parsed_skills.append(s.strip())
-        def clean_list(lst):
-            cleaned = []
-            seen = set()
-            for item in lst:
-                x = item.strip()
-                if len(x) < 3:
-                    continue
-                if x.lower() in seen:
-                    continue
-                seen.add(x.lower())
-                cleaned.append(x)
-            return cleaned
-        parsed_skills = clean_list(parsed_skills)
-        experience = clean_list(experience)
-        education = clean_list(education)
-        return {
-            "skills": parsed_skills,
-            "experience": experience,
-            "education": education,
-            "raw_text_preview": "\n".join(lines[:25])
-        }
+        return parse_profile_pdf(file)
     except Exception as e:
         return {"error": str(e)}
 
@@ -115,28 +61,285 @@ def build_prompt_from_profile_and_topic(profile_data: dict, topic: str, length:
 
 #This function connects to the Groq API, sends the query you type, and gets back AI-generated industry insights
 def fetch_industry_trends(query: str) -> str:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        return "Error: GROQ_API_KEY not set in environment."
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {"role": "system", "content": "You are an expert market research assistant. Provide concise, trend-focused insights."},
-            {"role": "user", "content": query}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 500
-    }
+    # no GROQ_API_KEY check here: get_llm_client() loads .env first and raises if the key is missing
+    model = "llama3-8b-8192"
+    messages = [
+        {"role": "system", "content": "You are an expert market research assistant. Provide concise, trend-focused insights."},
+        {"role": "user", "content": query}
+    ]
+
+    def request_trends():
+        # pooled, rate-limited and retried by the shared client, see llm_client.py
+        return get_llm_client().chat(messages, model=model, temperature=0.7, max_tokens=500)
+
     try:
-        res = requests.post(url, headers=headers, json=payload)
-        res.raise_for_status()
-        data = res.json()
-        return data["choices"][0]["message"]["content"]
+        return get_response_cache().cached_chat(model, messages, {"temperature": 0.7, "max_tokens": 500},
+                                                request_trends)
     except Exception as e:
         return f"Error fetching trends: {str(e)}"
 
+#This function streams a Groq chat completion as text chunks, so the UI can show tokens as they arrive.
+#Answers already in the response cache are yielded in one piece.
+def stream_groq_chat(prompt: str, temperature: float, max_tokens: int = 500):
+    model = "llama3-8b-8192"
+    messages = [{"role": "user", "content": prompt}]
+
+    def create_stream():
+        return get_llm_client().stream(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+
+    return get_response_cache().stream_chat(model, messages, {"temperature": temperature, "max_tokens": max_tokens},
+                                      create_stream)
+
+
+#Engagement Optimization tab: rewrite a post for a stronger hook, hashtags and flow (streamed)
+def optimize_post_stream(post_input: str):
+    prompt = f"""
+    You are a LinkedIn growth expert. 
+    Take the following LinkedIn post and optimize it for maximum engagement while keeping its core message.
+    - Make the hook stronger in the first line.
+    - Use concise, emotional, and actionable language.
+    - Include relevant hashtags (2-3 max).
+    - Make it feel authentic and relatable.
+
+    Original Post:
+    {post_input}
+    """
+    return stream_groq_chat(prompt, temperature=0.7)
+
+
+#Performance Analytics tab: score post(s) and suggest improvements (streamed)
+def analyze_performance_stream(analytics_input: str):
+    prompt = f"""
+    You are a LinkedIn post analytics expert.
+    Analyze the given LinkedIn post(s) and provide:
+    1. Engagement Score (0–10)
+    2. Clarity Score (0–10)
+    3. Emotional Appeal Score (0–10)
+    4. Tone & Style Feedback
+    5. 3 actionable improvement suggestions to boost engagement.
+
+    Post(s):
+    {analytics_input}
+    """
+    return stream_groq_chat(prompt, temperature=0.5)
+
+# ----------------- Background jobs -----------------
+#Heavy actions run as jobs (jobs.py): a button submits one and the script returns at once, so widgets stay
+#usable and a session can have several jobs running. Each tab shows its latest jobs with job_panel(), which
+#polls while any of them is still queued or running.
+JOB_POLL_SECONDS = 1
+
+
+def job_owner():
+    return st.session_state.setdefault("job_owner", uuid.uuid4().hex)
+
+
+def submit_job(kind, **args):
+    return get_job_queue().submit(kind, owner=job_owner(), **args)
+
+
+def stream_to_job(job, chunks):
+    """Collect streamed text, storing it as the job's partial result so the tab shows it growing."""
+    text = ""
+    for chunk in chunks:
+        job.check_cancelled()
+        text += chunk
+        job.partial(text)
+    return text
+
+
+@task("analyze_profile")
+def analyze_profile_job(job, pdf):
+    return extract_profile_data_from_pdf(pdf)
+
+
+@task("generate_post")
+def generate_post_job(job, prompt, tag, length, language):
+    # a fresh post every time: a cached one would only come back flagged as a duplicate
+    post = stream_to_job(job, generate_post_stream(length, language, prompt, use_cache=False))
+    post_id = save_post(content=post, tag=tag, length=length, language=language)
+    return {"post": post, "post_id": post_id, "duplicate_of": get_duplicate_of(post_id)}
+
+
+@task("summarize_url")
+def summarize_url_job(job, url):
+    summary = summarize_url(url)
+    save_post(content=summary, tag="Link Summary", length="N/A", language="English", url=url)
+    return summary
+
+
+@task("summarize_urls")
+def summarize_urls_job(job, urls):
+    job.progress(message=f"Fetching and summarizing {len(urls)} links...")
+    summaries = summarize_urls(urls)
+    # failed links (HTTP errors, timeouts) are reported, not saved as posts
+    save_posts([{"content": summary, "tag": "Link Summary", "length": "N/A", "language": "English",
+                 "url": link} for link, summary in zip(urls, summaries) if not isinstance(summary, Exception)])
+    return [[link, None, f"Error summarizing URL: {summary}"] if isinstance(summary, Exception)
+            else [link, summary, None] for link, summary in zip(urls, summaries)]
+
+
+@task("bulk_generate")
+def bulk_generate_job(job, specs):
+    from bulk_gen import generate_bulk
+
+    def progress(done, total, failed, eta):
+        left = f", about {eta:.0f}s left" if eta is not None else ""
+        job.progress(done / total, f"{done}/{total} posts ({failed} failed){left}")
+
+    _, stats = generate_bulk(specs, on_progress=progress, should_stop=job.cancelled)
+    return {key: stats[key] for key in ("specs", "stored", "failed", "seconds")}
+
+
+@task("industry_trends")
+def industry_trends_job(job, query):
+    return fetch_industry_trends(query)
+
+
+@task("optimize_post")
+def optimize_post_job(job, post):
+    return stream_to_job(job, optimize_post_stream(post))
+
+
+@task("analyze_performance")
+def analyze_performance_job(job, posts):
+    return stream_to_job(job, analyze_performance_stream(posts))
+
+
+def show_job(job, render):
+    if job["status"] in ACTIVE:
+        elapsed = time.time() - (job["started_at"] or job["created_at"])
+        label = job["message"] or ("Running" if job["status"] == RUNNING else "Queued")
+        bar_col, cancel_col = st.columns([5, 1])
+        bar_col.progress(job["progress"] or 0.0, text=f"{label} · {elapsed:.0f}s")
+        if cancel_col.button("Cancel", key=f"cancel:{job['id']}"):
+            get_job_queue().cancel(job["id"])
+        if job["result"] is not None:
+            render(job["result"])
+    elif job["status"] == DONE:
+        render(job["result"])
+    elif job["status"] == FAILED:
+        st.error(f"Job failed: {job['error']}")
+    else:
+        st.caption("Cancelled.")
+
+
+@st.experimental_fragment(run_every=JOB_POLL_SECONDS)
+def polling_job_panel(kind, render, limit):
+    job_list = get_job_queue().list_jobs(owner=job_owner(), kind=kind, limit=limit)
+    for job in job_list:
+        show_job(job, render)
+    if not any(job["status"] in ACTIVE for job in job_list):
+        # rerun the whole page once: stops the polling and refreshes listings with what the jobs saved
+        st.rerun()
+
+
+def job_panel(kind, render, limit=1):
+    """This session's latest jobs of one kind, newest first: progress and Cancel while running, then results."""
+    job_list = get_job_queue().list_jobs(owner=job_owner(), kind=kind, limit=limit)
+    if any(job["status"] in ACTIVE for job in job_list):
+        polling_job_panel(kind, render, limit)
+    else:
+        for job in job_list:
+            show_job(job, render)
+
+
+def show_profile(result):
+    if "error" in result:
+        st.error(f"Error while analyzing PDF: {result['error']}")
+        return
+    st.success("Profile analyzed successfully!")
+    st.session_state.profile_data = result
+    st.subheader("Extracted Profile Data")
+    st.markdown("**Skills**")
+    if result["skills"]:
+        for s in result["skills"]:
+            st.write(f"- {s}")
+    else:
+        st.write("_No skills detected_")
+    st.markdown("**Experience (examples)**")
+    if result["experience"]:
+        for e in result["experience"][:10]:
+            st.write(f"- {e}")
+    else:
+        st.write("_No experience lines detected_")
+    st.markdown("**Education**")
+    if result["education"]:
+        for ed in result["education"][:5]:
+            st.write(f"- {ed}")
+    else:
+        st.write("_No education lines detected_")
+    st.subheader("Raw text preview (first 25 lines)")
+    st.code(result.get("raw_text_preview", "No preview available"))
+
+
+def show_generated_post(result):
+    if isinstance(result, str):
+        # still streaming
+        st.write(result)
+        return
+    st.subheader("Generated Post")
+    st.write(result["post"])
+    if result["duplicate_of"]:
+        st.info(f"Post saved — flagged as a near-duplicate of saved post #{result['duplicate_of']}.")
+    else:
+        st.success("Post saved to database!")
+
+
+def show_summary(summary):
+    st.subheader("Summary")
+    st.write(summary)
+    st.success("Summary saved to database!")
+
+
+def show_summaries(results):
+    for link, summary, error in results:
+        st.markdown(f"**{link}**")
+        if error:
+            st.error(error)
+        else:
+            st.write(summary)
+    saved = sum(1 for _, _, error in results if not error)
+    st.success(f"{saved} summaries saved to database!")
+
+
+def show_bulk_result(stats):
+    st.success(f"{stats['stored']} posts generated and planned in {stats['seconds']:.0f}s")
+    if stats["failed"]:
+        st.warning(f"{stats['failed']} posts failed; generate those dates again.")
+
+
+def show_insights(insights):
+    st.subheader("Industry Insights")
+    st.write(insights)
+
+
+def show_optimized_post(post):
+    st.subheader("Optimized Post")
+    st.write(post)
+
+
+def show_performance_report(report):
+    st.subheader("Performance Analysis Report")
+    st.write(report)
+
+#Keyset pagination for the listings below: session_state[key] is a stack of page cursors
+#(None = first page), so only the visible page is fetched from the database.
+def current_page_cursor(key):
+    return st.session_state.setdefault(key, [None])[-1]
+
+
+def page_buttons(key, next_cursor, total):
+    pages = st.session_state[key]
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("← Previous", key=f"{key}:prev", disabled=len(pages) == 1):
+        pages.pop()
+        st.rerun()
+    info_col.caption(f"Page {len(pages)} · {total} total")
+    if next_col.button("Next →", key=f"{key}:next", disabled=next_cursor is None):
+        pages.append(next_cursor)
+        st.rerun()
+
 # ----------------- Streamlit App -----------------
 def main():
     st.set_page_config(page_title="LinkedIn AI Agent", layout="wide",initial_sidebar_state="expanded")
@@ -145,6 +348,17 @@ def main():
     if "profile_data" not in st.session_state:
         st.session_state.profile_data = {}
 
+    cache_stats = get_response_cache().stats()
+    st.sidebar.caption(f"LLM cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                       f"({cache_stats['entries']} entries)")
+    # LLM clients and the few-shot corpus are shared across reruns and sessions;
+    # rebuild them after changing .env or regenerating data/processed_posts.json
+    if st.sidebar.button("Reload resources"):
+        resources.invalidate()
+    job_counts = get_job_queue().stats()
+    st.sidebar.caption(f"Background jobs: {job_counts.get(RUNNING, 0)} running, "
+                       f"{job_counts.get(QUEUED, 0)} queued")
+
     tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Profile Analysis", "Generate Post", "Link Saver", "Content Calendar", "Industry Research", "Engagement Optimization","Performance Analysis"])
 
     with tab1:
@@ -152,40 +366,14 @@ def main():
         uploaded_pdf = st.file_uploader("Upload PDF (LinkedIn profile export / resume)", type=["pdf"])
         if st.button("Analyze Profile"):
             if uploaded_pdf:
-                with st.spinner("Analyzing profile PDF..."):
-                    result = extract_profile_data_from_pdf(uploaded_pdf)
-                if "error" in result:
-                    st.error(f"Error while analyzing PDF: {result['error']}")
-                else:
-                    st.success("Profile analyzed successfully!")
-                    st.session_state.profile_data = result
-                    st.subheader("Extracted Profile Data")
-                    st.markdown("**Skills**")
-                    if result["skills"]:
-                        for s in result["skills"]:
-                            st.write(f"- {s}")
-                    else:
-                        st.write("_No skills detected_")
-                    st.markdown("**Experience (examples)**")
-                    if result["experience"]:
-                        for e in result["experience"][:10]:
-                            st.write(f"- {e}")
-                    else:
-                        st.write("_No experience lines detected_")
-                    st.markdown("**Education**")
-                    if result["education"]:
-                        for ed in result["education"][:5]:
-                            st.write(f"- {ed}")
-                    else:
-                        st.write("_No education lines detected_")
-                    st.subheader("Raw text preview (first 25 lines)")
-                    st.code(result.get("raw_text_preview", "No preview available"))
+                submit_job("analyze_profile", files={"pdf": uploaded_pdf.getvalue()})
             else:
                 st.warning("Please upload a PDF file first to analyze.")
+        job_panel("analyze_profile", show_profile)
 
     with tab2:
         st.header("Step 2 — Generate Personalized LinkedIn Post")
-        fs = FewShotPosts()
+        fs = get_few_shot()
         tag_options = fs.get_tags() if hasattr(fs, "get_tags") else ["Networking", "Growth", "Rejection", "Career Change"]
         selected_tag = st.selectbox("Select topic", options=tag_options)
         selected_length = st.selectbox("Select length", options=["Short", "Medium", "Long"])
@@ -194,30 +382,43 @@ def main():
         if st.button("Generate Post"):
             profile_data = st.session_state.get("profile_data", {}) if use_profile_checkbox else {}
             prompt = build_prompt_from_profile_and_topic(profile_data, selected_tag, selected_length, selected_language)
-            with st.spinner("Generating post..."):
-                post = generate_post(selected_length, selected_language, prompt)
-            st.subheader("Generated Post")
-            st.write(post)
-            save_post(content=post, tag=selected_tag, length=selected_length, language=selected_language)
-            st.success("Post saved to database!")
+            submit_job("generate_post", prompt=prompt, tag=selected_tag, length=selected_length,
+                       language=selected_language)
+        job_panel("generate_post", show_generated_post, limit=3)
         st.markdown("### Saved Posts")
-        saved_posts = get_all_posts()
+        filter_col1, filter_col2 = st.columns(2)
+        filter_tag = filter_col1.selectbox("Filter by topic", options=["All"] + tag_options + ["Link Summary"])
+        filter_language = filter_col2.selectbox("Filter by language", options=["All", "English", "Hinglish"])
+        post_filters = {
+            "tag": None if filter_tag == "All" else filter_tag,
+            "language": None if filter_language == "All" else filter_language,
+        }
+        # new filters start again from the first page
+        pages_key = f"posts_pages:{filter_tag}:{filter_language}"
+        saved_posts, next_cursor = get_posts_page(limit=20, cursor=current_page_cursor(pages_key), **post_filters)
         for p in saved_posts:
             st.markdown(f"**[{p[1]}]** {p[2]}")
+        page_buttons(pages_key, next_cursor, count_posts(**post_filters))
 
     with tab3:
         st.header("Link Saver — Paste a URL to summarize")
         url = st.text_input("Enter URL to summarize")
         if st.button("Summarize Link"):
             if url:
-                with st.spinner("Fetching and summarizing..."):
-                    summary = summarize_url(url)
-                st.subheader("Summary")
-                st.write(summary)
-                save_post(content=summary, tag="Link Summary", length="N/A", language="English", url=url)
-                st.success("Summary saved to database!")
+                submit_job("summarize_url", url=url)
             else:
                 st.warning("Please enter a valid URL")
+        job_panel("summarize_url", show_summary, limit=3)
+
+        st.markdown("#### Reading list")
+        reading_list = st.text_area("Or paste several URLs, one per line")
+        if st.button("Summarize All"):
+            urls = [u.strip() for u in reading_list.splitlines() if u.strip()]
+            if urls:
+                submit_job("summarize_urls", urls=urls)
+            else:
+                st.warning("Please paste at least one URL")
+        job_panel("summarize_urls", show_summaries)
 
     with tab4:
         st.header("Content Calendar")
@@ -229,10 +430,31 @@ def main():
             if submitted and title and description:
                 add_calendar_entry(title, description, str(date))
                 st.success("Entry added to calendar!")
+        with st.expander("Generate posts in bulk"):
+            bulk_tags = st.multiselect("Topics (cycled)", options=get_few_shot().get_tags())
+            bulk_col1, bulk_col2, bulk_col3 = st.columns(3)
+            bulk_start = bulk_col1.date_input("First date", key="bulk_start")
+            bulk_days = bulk_col2.number_input("Days", min_value=1, max_value=92, value=30)
+            bulk_per_day = bulk_col3.number_input("Posts per day", min_value=1, max_value=5, value=1)
+            bulk_lengths = st.multiselect("Lengths (cycled)", ["Short", "Medium", "Long"], default=["Medium"])
+            bulk_languages = st.multiselect("Languages (cycled)", ["English", "Hinglish"], default=["English"])
+            if st.button("Generate & Plan"):
+                if bulk_tags and bulk_lengths and bulk_languages:
+                    from bulk_gen import plan_specs
+                    submit_job("bulk_generate", specs=plan_specs(bulk_tags, bulk_start, int(bulk_days),
+                                                                 int(bulk_per_day), bulk_lengths, bulk_languages))
+                else:
+                    st.warning("Pick at least one topic, length and language")
+            job_panel("bulk_generate", show_bulk_result)
         st.subheader("All Calendar Entries")
-        entries = get_all_entries()
+        status_filter = st.selectbox("Show", ["All", "Planned", "Completed"])
+        entry_status = None if status_filter == "All" else status_filter
+        entry_pages_key = f"calendar_pages:{status_filter}"
+        entries, next_entry_cursor = get_entries_page(limit=20, cursor=current_page_cursor(entry_pages_key),
+                                                      status=entry_status)
         if entries:
             st.table(entries)
+            page_buttons(entry_pages_key, next_entry_cursor, count_entries(status=entry_status))
         else:
             st.info("No calendar entries yet.")
         st.write("Update entry status")
@@ -247,12 +469,10 @@ def main():
         user_query = st.text_area("Enter your research query", placeholder="e.g. Latest AI trends in 2025")
         if st.button("Get Trends"):
             if user_query.strip():
-                with st.spinner("Fetching industry insights..."):
-                    insights = fetch_industry_trends(user_query)
-                st.subheader("Industry Insights")
-                st.write(insights)
+                submit_job("industry_trends", query=user_query)
             else:
                 st.warning("Please enter a query to research.")
+        job_panel("industry_trends", show_insights)
 
     with tab6:
         st.header("Engagement Optimization — Make Your Post Go Viral 🚀")
@@ -260,41 +480,10 @@ def main():
 
         if st.button("Optimize for Engagement"):
             if post_input.strip():
-                with st.spinner("Optimizing post for higher engagement..."):
-                    from groq import Groq
-                    import os
-                    from dotenv import load_dotenv
-
-                    # Load API key from .env
-                    load_dotenv()
-                    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-                    client = Groq(api_key=GROQ_API_KEY)
-
-                    prompt = f"""
-                    You are a LinkedIn growth expert. 
-                    Take the following LinkedIn post and optimize it for maximum engagement while keeping its core message.
-                    - Make the hook stronger in the first line.
-                    - Use concise, emotional, and actionable language.
-                    - Include relevant hashtags (2-3 max).
-                    - Make it feel authentic and relatable.
-
-                    Original Post:
-                    {post_input}
-                    """
-
-                    response = client.chat.completions.create(
-                        model="llama3-8b-8192",
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.7,
-                        max_tokens=500
-                    )
-
-                    optimized_post = response.choices[0].message.content
-
-                st.subheader("Optimized Post")
-                st.write(optimized_post)
+                submit_job("optimize_post", post=post_input)
             else:
                 st.warning("Please paste a LinkedIn post first!")
+        job_panel("optimize_post", show_optimized_post)
 
     with tab7:
         st.header("📊 Performance Analytics — Track & Improve Your LinkedIn Posts")
@@ -302,43 +491,10 @@ def main():
 
         if st.button("Analyze Performance"):
             if analytics_input.strip():
-                with st.spinner("Analyzing your post performance..."):
-                    from groq import Groq
-                    import os
-                    from dotenv import load_dotenv
-
-                    # Load API key from .env
-                    load_dotenv()
-                    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-                    client = Groq(api_key=GROQ_API_KEY)
-
-                    prompt = f"""
-                    You are a LinkedIn post analytics expert.
-                    Analyze the given LinkedIn post(s) and provide:
-                    1. Engagement Score (0–10)
-                    2. Clarity Score (0–10)
-                    3. Emotional Appeal Score (0–10)
-                    4. Tone & Style Feedback
-                    5. 3 actionable improvement suggestions to boost engagement.
-
-                    Post(s):
-                    {analytics_input}
-                    """
-
-                    response = client.chat.completions.create(
-                        model="llama3-8b-8192",
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.5,
-                        max_tokens=500
-                    )
-
-                    analytics_result = response.choices[0].message.content
-
-                st.subheader("Performance Analysis Report")
-                st.write(analytics_result)
+                submit_job("analyze_performance", posts=analytics_input)
             else:
                 st.warning("Please paste a LinkedIn post first!")
-
+        job_panel("analyze_performance", show_performance_report)
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,13 @@
-from llm_helper import llm
-from few_shot import FewShotPosts
+from llm_helper import get_llm, get_llm_uncached, stream_text
+from resources import shared
+
+
+@shared
+def get_few_shot():
+    """Few-shot example corpus, loaded once per process."""
+    from few_shot import FewShotPosts
+    return FewShotPosts()
 
-few_shot = FewShotPosts()
 
 def get_length_str(length):
     if length == "Short":
@@ -12,6 +18,35 @@ def get_length_str(length):
         return "11 to 15 lines"
 
 def get_prompt(length, language, tag):
+    return get_prompts([(length, language, tag)])[0]
+
+def get_prompts(specs):
+    """
+    Prompts for many (length, language, tag) specs in one pass over the few-shot
+    corpus: each distinct spec is looked up once, and all free-text topics short
+    of examples share one similarity search per (language, length).
+    """
+    few_shot = get_few_shot()
+    distinct = list(dict.fromkeys(specs))
+    # max 2 examples, best performing first
+    examples = {spec: few_shot.get_filtered_posts(spec[0], spec[1], spec[2], limit=2, by_engagement=True)
+                for spec in distinct}
+    # free-text topics rarely match a tag exactly: fill up with the most similar posts
+    short = {}
+    for spec in distinct:
+        if len(examples[spec]) < 2:
+            short.setdefault((spec[1], spec[0]), []).append(spec)
+    for (language, length), group in short.items():
+        limit = 2 + max(len(examples[spec]) for spec in group)
+        similar = few_shot.get_similar_posts_many([spec[2] for spec in group], language, length, limit=limit)
+        for spec, posts in zip(group, similar):
+            seen = {post['text'] for post in examples[spec]}
+            fill = [post for post in posts if post['text'] not in seen]
+            examples[spec] = examples[spec] + fill[:2 - len(examples[spec])]
+    prompts = {spec: _build_prompt(*spec, examples[spec]) for spec in distinct}
+    return [prompts[spec] for spec in specs]
+
+def _build_prompt(length, language, tag, examples):
     length_str = get_length_str(length)
 
     prompt = f'''
@@ -23,32 +58,37 @@ Generate a LinkedIn post using the below information. No preamble.
 If Language is Hinglish then it means it is a mix of Hindi and English. 
 The script for the generated post should always be English.
 '''
-    examples = few_shot.get_filtered_posts(length, language, tag)
     if len(examples) > 0:
         prompt += "\n4) Use the writing style as per the following examples."
 
     for i, post in enumerate(examples):
         post_text = post['text']
         prompt += f'\n\nExample {i+1}: \n\n{post_text}'
-        if i == 1:  # max 2 examples
-            break
 
     return prompt
 
-def generate_post(length, language, tag):
+def generate_post(length, language, tag, use_cache=True):
     """
     This function generates a LinkedIn post using LLM.
     Inputs:
         length: Short/Medium/Long
         language: English/Hinglish
         tag: topic string
+        use_cache: False to always sample a fresh post instead of reusing a cached one
     Returns:
         post content as string
     """
     prompt = get_prompt(length, language, tag)
-    response = llm.invoke(prompt)
+    response = (get_llm() if use_cache else get_llm_uncached()).invoke(prompt)
     return response.content
 
+def generate_post_stream(length, language, tag, use_cache=True):
+    """
+    Same as generate_post, but yields the post in chunks as the LLM produces them.
+    """
+    prompt = get_prompt(length, language, tag)
+    yield from stream_text(get_llm() if use_cache else get_llm_uncached(), prompt)
+
 if __name__ == "__main__":
     # test example
     print(generate_post("Medium", "English", "Mental Health"))
@@ -1,20 +1,60 @@
 import json
-from llm_helper import llm
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from llm_helper import get_llm
+from corpus import write_corpus, corpus_path_for
+from vector_index import write_index, vectors_path_for
+from checkpoint import CheckpointStore, content_hash
+from dedup import find_duplicates
+from rate_limit import RateLimiter, estimate_tokens, limited_call
+from tag_unify import unify_tags
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 
 
-def process_posts(raw_file_path, processed_file_path=None):
+def process_posts(raw_file_path, processed_file_path=None, max_workers=8, limiter=None, model=None,
+                  checkpoint_path=None, dedupe=True):
+    """
+    Extract metadata for every raw post and write processed_posts.json (+ .corpus).
+    Metadata is checkpointed per post by content hash as soon as it arrives, so a
+    re-run only calls the LLM for new or previously failed posts.
+    dedupe: drop near-duplicates of earlier posts (dedup.py) before any LLM call
+    Returns stats: extract_metadata_batch's (posts, retries, errors, seconds, posts_per_sec)
+    plus 'duplicates' dropped, 'already_processed' posts and 'tags' (tag_unify.unify_tags stats).
+    """
     with open(raw_file_path, encoding='utf-8') as file:
         posts = json.load(file)
-        enriched_posts = []
-        for post in posts:
-            metadata = extract_metadata(post['text'])
-            post_with_metadata = post | metadata
-            enriched_posts.append(post_with_metadata)
 
-    unified_tags = get_unified_tags(enriched_posts)
+    duplicates = 0
+    if dedupe:
+        originals = find_duplicates(post['text'] for post in posts)
+        posts = [post for post, original in zip(posts, originals) if original is None]
+        duplicates = len(originals) - len(posts)
+
+    store = CheckpointStore(checkpoint_path or os.path.splitext(processed_file_path)[0] + ".checkpoint.db")
+    hashes = [content_hash(post['text']) for post in posts]
+    done = store.get_many(hashes)
+    # one LLM call per distinct new post
+    pending = list({h: post['text'] for h, post in zip(hashes, posts) if h not in done}.items())
+
+    def save(i, metadata):
+        h = pending[i][0]
+        store.put(h, metadata)
+        done[h] = metadata
+
+    _, stats = extract_metadata_batch([text for _, text in pending], max_workers=max_workers,
+                                      limiter=limiter, model=model, on_result=save)
+    stats["duplicates"] = duplicates
+    stats["already_processed"] = len(posts) - len(pending)
+
+    enriched_posts = [post | done[h] for post, h in zip(posts, hashes) if h in done]
+
+    tags = [tag for post in enriched_posts for tag in post['tags']]
+    unified_tags, stats["tags"] = unify_tags(tags, model=model, store=store, max_workers=max_workers,
+                                             limiter=limiter)
+    store.close()
     for post in enriched_posts:
         current_tags = post['tags']
         new_tags = {unified_tags[tag] for tag in current_tags}
@@ -22,9 +62,54 @@ def process_posts(raw_file_path, processed_file_path=None):
 
     with open(processed_file_path, encoding='utf-8', mode="w") as outfile:
         json.dump(enriched_posts, outfile, indent=4)
-
-
-def extract_metadata(post):
+    # compiled copy that FewShotPosts mmaps at startup, and its similarity index
+    write_corpus(enriched_posts, corpus_path_for(processed_file_path))
+    write_index([post['text'] for post in enriched_posts], vectors_path_for(processed_file_path))
+    return stats
+
+
+def extract_metadata_batch(texts, max_workers=8, limiter=None, model=None, on_result=None):
+    """
+    Run extract_metadata over many posts with bounded concurrency.
+    Every call waits on the rate limiter (requests and tokens per minute) and is
+    retried with backoff on 429/5xx; for the default model that is the shared
+    LLMClient's limiter and retries, `limiter` only applies to other models.
+    Results keep the input order.
+    on_result(i, metadata) is called from the calling thread as each post finishes.
+    Returns (results, stats); a failed post has result None and an entry in stats['errors'].
+    """
+    model = model or get_llm()
+    limiter = limiter or RateLimiter()
+    results = [None] * len(texts)
+    stats = {"posts": len(texts), "retries": 0, "errors": []}
+
+    def on_retry(error, attempt):
+        stats["retries"] += 1
+
+    def task(text):
+        return limited_call(lambda: extract_metadata(text, model=model), model, limiter, estimate_tokens(text),
+                            on_retry=on_retry)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(task, text): i for i, text in enumerate(texts)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                stats["errors"].append((i, e))
+                continue
+            if on_result:
+                on_result(i, results[i])
+
+    stats["errors"].sort(key=lambda item: item[0])
+    stats["seconds"] = time.perf_counter() - start
+    stats["posts_per_sec"] = len(texts) / stats["seconds"] if stats["seconds"] else 0.0
+    return results, stats
+
+
+def extract_metadata(post, model=None):
     template = '''
     You are given a LinkedIn post. You need to extract number of lines, language of the post and tags.
     1. Return a valid JSON. No preamble. 
@@ -37,7 +122,7 @@ def extract_metadata(post):
     '''
 
     pt = PromptTemplate.from_template(template)
-    chain = pt | llm
+    chain = pt | (model or get_llm())
     response = chain.invoke(input={"post": post})
 
     try:
@@ -48,38 +133,64 @@ def extract_metadata(post):
     return res
 
 
-def get_unified_tags(posts_with_metadata):
-    unique_tags = set()
-    # Loop through each post and extract the tags
-    for post in posts_with_metadata:
-        unique_tags.update(post['tags'])  # Add the tags to the set
-
-    unique_tags_list = ','.join(unique_tags)
-
-    template = '''I will give you a list of tags. You need to unify tags with the following requirements,
-    1. Tags are unified and merged to create a shorter list. 
-       Example 1: "Jobseekers", "Job Hunting" can be all merged into a single tag "Job Search". 
-       Example 2: "Motivation", "Inspiration", "Drive" can be mapped to "Motivation"
-       Example 3: "Personal Growth", "Personal Development", "Self Improvement" can be mapped to "Self Improvement"
-       Example 4: "Scam Alert", "Job Scam" etc. can be mapped to "Scams"
-    2. Each tag should be follow title case convention. example: "Motivation", "Job Search"
-    3. Output should be a JSON object, No preamble
-    3. Output should have mapping of original tag and the unified tag. 
-       For example: {{"Jobseekers": "Job Search",  "Job Hunting": "Job Search", "Motivation": "Motivation}}
-
-    Here is the list of tags: 
-    {tags}
-    '''
-    pt = PromptTemplate.from_template(template)
-    chain = pt | llm
-    response = chain.invoke(input={"tags": str(unique_tags_list)})
-    try:
-        json_parser = JsonOutputParser()
-        res = json_parser.parse(response.content)
-    except OutputParserException:
-        raise OutputParserException("Context too big. Unable to parse jobs.")
-    return res
+def get_unified_tags(posts_with_metadata, model=None, store=None, max_workers=8, limiter=None):
+    """
+    {tag: unified tag} for every tag of the posts, via tag_unify.unify_tags: known
+    tags come from the store, spelling variants are merged locally and the rest is
+    unified by the LLM in concurrent batches.
+    """
+    tags = [tag for post in posts_with_metadata for tag in post['tags']]
+    return unify_tags(tags, model=model, store=store, max_workers=max_workers, limiter=limiter)[0]
+
+
+def print_report(stats):
+    """What process_posts did, for the command line."""
+    tag_stats = stats['tags']
+    total = stats['already_processed'] + stats['posts']
+    print(f"Dropped {stats['duplicates']} near-duplicate posts")
+    print(f"{stats['already_processed']} of {total} posts already processed, {stats['posts']} to go")
+    print(f"Extracted metadata for {stats['posts']} posts in {stats['seconds']:.1f}s "
+          f"({stats['posts_per_sec']:.2f} posts/s, {stats['retries']} retries)")
+    if stats['errors']:
+        index, error = stats['errors'][0]
+        print(f"Skipped {len(stats['errors'])} posts that failed (first error: {error!r}); "
+              f"re-run to retry them")
+    print(f"Unified {tag_stats['tags']} tags: {tag_stats['known']} known, "
+          f"{tag_stats['local']} merged locally, {tag_stats['llm_tags']} sent to the LLM in {tag_stats['llm_calls']} "
+          f"calls ({tag_stats['seconds']:.1f}s)")
+    if tag_stats['errors'] or tag_stats['unanswered']:
+        print(f"{tag_stats['unanswered']} tags got no answer ({len(tag_stats['errors'])} failed batches); "
+              f"they are kept as is and retried on the next run")
 
 
 if __name__ == "__main__":
-    process_posts("data/raw_posts.json", "data/processed_posts.json")
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract metadata and unify tags for raw LinkedIn posts.")
+    parser.add_argument("raw", nargs="?", default="data/raw_posts.json")
+    parser.add_argument("processed", nargs="?")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=30, help="Groq requests per minute")
+    parser.add_argument("--tpm", type=int, default=6000, help="Groq tokens per minute")
+    parser.add_argument("--checkpoint", help="checkpoint db (default: <processed>.checkpoint.db)")
+    parser.add_argument("--keep-duplicates", action="store_true", help="don't drop near-duplicate posts")
+    parser.add_argument("--fake", action="store_true",
+                        help="benchmark against a local fake LLM (200ms latency, 5%% 429s) instead of Groq")
+    args = parser.parse_args()
+
+    model = None
+    limiter = RateLimiter(args.rpm, args.tpm)
+    processed = args.processed or "data/processed_posts.json"
+    if not args.fake:
+        # Groq requests are limited (and retried) by the shared client
+        from llm_helper import get_llm_client
+        get_llm_client().limiter = limiter
+    else:
+        import tempfile
+        from fake_llm import FakeChatModel, preprocess_responder
+        model = FakeChatModel(responder=preprocess_responder, latency=0.2, jitter=0.1, error_rate=0.05)
+        # never overwrite the real corpus with fake metadata
+        processed = args.processed or os.path.join(tempfile.mkdtemp(), "processed_posts.json")
+    print_report(process_posts(args.raw, processed, max_workers=args.workers,
+                               limiter=limiter, model=model, checkpoint_path=args.checkpoint,
+                               dedupe=not args.keep_duplicates))
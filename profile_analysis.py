@@ -1,29 +1,113 @@
-import requests
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+from fetcher import CONNECT_TIMEOUT, READ_TIMEOUT, FetchEngine
+from linkedin_oauth import token_manager
+from singleflight import SingleFlight
 
-def fetch_profile(access_token: str) -> dict:
-    headers = {
+# LinkedIn REST API base; point it at a local mock for tests (see __main__)
+API_BASE = os.getenv("LINKEDIN_API_BASE", "https://api.linkedin.com/v2")
+PAGE_SIZE = 50
+PROFILE_TTL = 600  # seconds a fetched profile is reused for the same token
+
+_engine = FetchEngine(timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="linkedin")
+_page_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="linkedin-page")
+_flight = SingleFlight()
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def _headers(access_token):
+    return {
         'Authorization': f'Bearer {access_token}',
         'X-Restli-Protocol-Version': '2.0.0'
     }
 
-    # 1️⃣ Basic Profile
-    profile_url = "https://api.linkedin.com/v2/me"
-    profile_data = requests.get(profile_url, headers=headers).json()
 
-    # 2️⃣ Skills
-    skills_url = "https://api.linkedin.com/v2/skills"
-    skills_data = requests.get(skills_url, headers=headers).json()
+def _get_json(url, access_token, params=None):
+    response = _engine.get(url, headers=_headers(access_token), params=params)
+    response.raise_for_status()
+    return response.json()
+
 
-    # Optional: Fetch positions (experience)
-    positions_url = "https://api.linkedin.com/v2/positions"
-    positions_data = requests.get(positions_url, headers=headers).json()
+def iter_elements(path, access_token, base_url=None, page_size=PAGE_SIZE):
+    """
+    Yield the elements of a paged collection (e.g. "/skills") page by page.
+    When the first page reports paging.total, the remaining pages are requested
+    concurrently (and still yielded in order), stepping by the number of elements
+    the server actually returned, since it may cap count below page_size;
+    otherwise paging.links rel="next" is followed one page at a time.
+    """
+    url = (base_url or API_BASE) + path
+    page = _get_json(url, access_token, {"start": 0, "count": page_size})
+    while True:
+        elements = page.get("elements", [])
+        yield from elements
+        paging = page.get("paging") or {}
+        if elements and "total" in paging:
+            step, total = len(elements), paging["total"]
+            starts = range(paging.get("start", 0) + step, total, step)
+            pages = [_page_executor.submit(_get_json, url, access_token, {"start": start, "count": step})
+                     for start in starts]
+            for start, future in zip(starts, pages):
+                got = future.result().get("elements", [])
+                yield from got
+                # a page shorter than the first: fetch the rest of its range before moving on
+                position, end = start + len(got), min(start + step, total)
+                while got and position < end:
+                    got = _get_json(url, access_token, {"start": position, "count": end - position}).get("elements", [])
+                    yield from got
+                    position += len(got)
+            return
+        next_link = next((link["href"] for link in paging.get("links", []) if link.get("rel") == "next"), None)
+        if not next_link:
+            return
+        url = urljoin(url, next_link)
+        page = _get_json(url, access_token)
 
+
+def _fetch(access_token, base_url):
+    # the three requests run concurrently, so latency is the slowest one, not the sum
+    profile = _executor.submit(_get_json, base_url + "/me", access_token)
+    skills = _executor.submit(lambda: list(iter_elements("/skills", access_token, base_url)))
+    positions = _executor.submit(lambda: list(iter_elements("/positions", access_token, base_url)))
     return {
-        "profile": profile_data,
-        "skills": skills_data,
-        "positions": positions_data
+        "profile": profile.result(),
+        "skills": {"elements": skills.result()},
+        "positions": {"elements": positions.result()}
     }
 
+
+def fetch_profile(access_token: str = None, max_age=PROFILE_TTL, base_url=None) -> dict:
+    """
+    Profile, skills and positions for the token's member, fetched concurrently.
+    Without access_token, the signed-in account's token comes from linkedin_oauth.token_manager.
+    Results are cached per token for max_age seconds (0 forces a refetch);
+    concurrent calls for the same token share one fetch.
+    """
+    access_token = access_token or token_manager.get_token()
+    base_url = base_url or API_BASE
+    key = hashlib.sha256(f"{base_url}\0{access_token}".encode()).hexdigest()
+    with _profiles_lock:
+        cached = _profiles.get(key)
+    if cached and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+
+    def fetch():
+        result = _fetch(access_token, base_url)
+        now = time.monotonic()
+        with _profiles_lock:
+            for stale in [k for k, (fetched, _) in _profiles.items() if now - fetched >= PROFILE_TTL]:
+                del _profiles[stale]
+            _profiles[key] = (now, result)
+        return result
+    return _flight.do(key, fetch)
+
+
 def analyze_profile(profile_json: dict) -> dict:
     profile = profile_json.get("profile", {})
     skills_data = profile_json.get("skills", {})
@@ -46,3 +130,81 @@ def analyze_profile(profile_json: dict) -> dict:
     }
 
     return structured_profile
+
+
+if __name__ == "__main__":
+    # Benchmark against a local mock of the LinkedIn endpoints (80 ms per request,
+    # 120 skills and 30 positions served 50 per page), then a check against a
+    # server that caps each page at 10 elements whatever count is asked for.
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+    import requests
+
+    COLLECTIONS = {
+        "/v2/skills": [{"name": f"Skill {i}"} for i in range(120)],
+        "/v2/positions": [{"title": f"Role {i}", "companyName": f"Company {i}", "startDate": {"year": 2000 + i}}
+                          for i in range(30)],
+    }
+    page_cap = [None]
+    ME = {"localizedFirstName": "Jane", "localizedLastName": "Doe", "headline": {"localized": {"en_US": "Engineer"}}}
+
+    class MockLinkedIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(0.08)
+            url = urlsplit(self.path)
+            if self.headers.get("Authorization") != "Bearer test-token":
+                status, body = 401, {"message": "Invalid access token"}
+            elif url.path == "/v2/me":
+                status, body = 200, ME
+            elif url.path in COLLECTIONS:
+                query = parse_qs(url.query)
+                start, count = int(query.get("start", [0])[0]), int(query.get("count", [10])[0])
+                count = min(count, page_cap[0] or count)
+                elements = COLLECTIONS[url.path]
+                links = [{"rel": "next", "href": f"{url.path}?start={start + count}&count={count}"}] \
+                    if start + count < len(elements) else []
+                status, body = 200, {"elements": elements[start:start + count],
+                                     "paging": {"start": start, "count": count, "total": len(elements),
+                                                "links": links}}
+            else:
+                status, body = 404, {"message": "Not found"}
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockLinkedIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/v2"
+
+    # previous implementation: three sequential requests, first page only
+    start = time.perf_counter()
+    headers = _headers("test-token")
+    for path in ("/me", "/skills", "/positions"):
+        requests.get(base + path, headers=headers).json()
+    print(f"sequential requests.get:   {(time.perf_counter() - start) * 1000:6.0f} ms (first page of each only)")
+
+    start = time.perf_counter()
+    profile = analyze_profile(fetch_profile("test-token", base_url=base))
+    print(f"fetch_profile, cold:       {(time.perf_counter() - start) * 1000:6.0f} ms "
+          f"({len(profile['skills'])} skills, {len(profile['experience'])} positions)")
+    start = time.perf_counter()
+    fetch_profile("test-token", base_url=base)
+    print(f"fetch_profile, cached:     {(time.perf_counter() - start) * 1000:6.3f} ms")
+    page_cap[0] = 10
+    capped = list(iter_elements("/skills", "test-token", base_url=base))
+    assert [s["name"] for s in capped] == [s["name"] for s in COLLECTIONS["/v2/skills"]], len(capped)
+    print(f"pages capped at 10:        all {len(capped)} skills, in order")
+    try:
+        fetch_profile("bad-token", base_url=base)
+    except requests.HTTPError as e:
+        print(f"invalid token:             {e}")
+    server.shutdown()
@@ -0,0 +1,280 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Profile / résumé PDF parsing for main.py's "Analyze Profile".
+# Page text comes from pdfium (pypdfium2, installed with pdfplumber), which is
+# much faster than pdfplumber's layout analysis; large documents are split into
+# page ranges extracted in a process pool. Lines are classified with one
+# precompiled regex per section, and parsed results are cached by the PDF's
+# content hash, so analyzing the same file again is free.
+
+BACKENDS = ("pdfium", "pdfplumber")
+PARALLEL_MIN_PAGES = 16   # below this, starting worker processes costs more than it saves
+MAX_WORKERS = os.cpu_count() or 1
+MAX_CACHED = 128
+
+
+def _keywords(words):
+    """Case-insensitive matcher for any of words anywhere in a line (same as `any(w in line.lower() ...)`)."""
+    return re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+
+
+# section headings, checked in this order
+HEADINGS = (
+    ("skills", _keywords(["skill", "skills", "technical skills", "core skills"])),
+    ("experience", _keywords(["experience", "work experience", "professional experience", "intern"])),
+    ("education", _keywords(["education", "academic", "qualification", "degree", "bachelor", "master",
+                             "college", "university"])),
+)
+
+# hints for the first section when the text starts without a heading
+EXPERIENCE_HINTS = _keywords(["company", "inc", "ltd", "pvt", "intern", "internship", "worked", "project"])
+EDUCATION_HINTS = _keywords(["bachelor", "master", "b.sc", "b.tech", "bachelor's", "university", "college",
+                             "graduat"])
+SKILL_HINTS = _keywords(["python", "java", "excel", "sql", "machine learning", "ml"])
+
+
+# ===== Page extraction =====
+
+def _extract_range(data, start, stop, backend):
+    """Text of pages [start, stop) of the PDF in data; runs in a worker process for large files."""
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return [pdf[i].get_textpage().get_text_range() for i in range(start, stop)]
+        finally:
+            pdf.close()
+    import io
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_count(data, backend):
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    import io
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Worker processes shared by all callers; spawned rather than forked, as Streamlit runs threads."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def extract_pages(data, backend="pdfium", workers=None):
+    """List of page texts of the PDF in data, extracted in parallel page ranges for large files."""
+    global _pool
+    workers = workers or MAX_WORKERS
+    pages = _page_count(data, backend)
+    if workers < 2 or pages < PARALLEL_MIN_PAGES:
+        return _extract_range(data, 0, pages, backend)
+    step = -(-pages // workers)
+    try:
+        pool = _get_pool()
+        futures = [pool.submit(_extract_range, data, start, min(start + step, pages), backend)
+                   for start in range(0, pages, step)]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        # a worker died (out of memory, killed); start a fresh pool next time and finish here
+        with _pool_lock:
+            _pool = None
+        return _extract_range(data, 0, pages, backend)
+
+
+# ===== Section parsing =====
+
+def _clean_list(lst):
+    cleaned = []
+    seen = set()
+    for item in lst:
+        x = item.strip()
+        if len(x) < 3:
+            continue
+        if x.lower() in seen:
+            continue
+        seen.add(x.lower())
+        cleaned.append(x)
+    return cleaned
+
+
+def parse_profile_text(text):
+    """Split profile text into skills, experience and education lines."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    sections = {"skills": [], "experience": [], "education": []}
+    current_section = None
+    for line in lines:
+        heading = next((name for name, pattern in HEADINGS if pattern.search(line)), None)
+        if heading:
+            current_section = heading
+            continue
+        if current_section is None:
+            if EXPERIENCE_HINTS.search(line):
+                current_section = "experience"
+            elif EDUCATION_HINTS.search(line):
+                current_section = "education"
+            elif ("," in line and len(line.split()) <= 12) or SKILL_HINTS.search(line):
+                current_section = "skills"
+        if current_section:
+            sections[current_section].append(line)
+
+    parsed_skills = []
+    for s in sections["skills"]:
+        if "," in s:
+            parsed_skills.extend(p.strip() for p in s.split(",") if p.strip())
+        else:
+            parsed_skills.append(s.strip())
+    return {
+        "skills": _clean_list(parsed_skills),
+        "experience": _clean_list(sections["experience"]),
+        "education": _clean_list(sections["education"]),
+        "raw_text_preview": "\n".join(lines[:25])
+    }
+
+
+# ===== Cached entry point =====
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _read_bytes(file):
+    """PDF bytes from a path, bytes, or file-like object (e.g. Streamlit's UploadedFile)."""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    file.seek(0)
+    return file.read()
+
+
+def parse_profile_pdf(file, backend="pdfium", workers=None):
+    """
+    Parsed profile of a PDF (path, bytes or file-like). Results are cached by the
+    SHA-256 of the file, so the same upload is only parsed once per process.
+    Raises on unreadable PDFs.
+    """
+    data = _read_bytes(file)
+    key = (hashlib.sha256(data).hexdigest(), backend)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _copy(_cache[key])
+
+    result = parse_profile_text("\n".join(extract_pages(data, backend, workers)))
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return _copy(result)
+
+
+def _copy(result):
+    return {k: list(v) if isinstance(v, list) else v for k, v in result.items()}
+
+
+SAMPLE_PAGE = ["Jane Doe - Data Engineer", "Skills", "Python, SQL, Spark, Airflow", "Machine learning, Excel",
+               "Experience", "Senior Engineer at Acme Inc", "Built pipelines processing 2TB/day", "Education",
+               "B.Tech Computer Science, Example University"] * 5
+
+
+def make_text_pdf(pages_lines):
+    """Minimal text-only PDF (Helvetica), one list of lines per page; sample input for benchmarks."""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", None]
+    kids = []
+    for lines in pages_lines:
+        ops = ["BT /F1 10 Tf 14 TL 50 800 Td"]
+        ops += ["(%s) Tj T*" % line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = "\n".join(ops + ["ET"]).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1,
+                                                                             len(objects), xref)
+    return bytes(out)
+
+
+if __name__ == "__main__":
+    # Benchmark: the previous serial pdfplumber + list-scan implementation vs.
+    # parse_profile_pdf, on PDFs given as arguments or a generated 60-page CV.
+    import sys
+    import time
+
+    def old_parse(data):
+        import io
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        current, out = None, {"skills": [], "experience": [], "education": []}
+        for line in lines:
+            low = line.lower()
+            if any(h in low for h in ["skill", "skills", "technical skills", "core skills"]):
+                current = "skills"
+                continue
+            if any(h in low for h in ["experience", "work experience", "professional experience", "intern"]):
+                current = "experience"
+                continue
+            if any(h in low for h in ["education", "academic", "qualification", "degree", "bachelor", "master",
+                                      "college", "university"]):
+                current = "education"
+                continue
+            if current:
+                out[current].append(line)
+        return out
+
+    if len(sys.argv) > 1:
+        files = {path: open(path, "rb").read() for path in sys.argv[1:]}
+    else:
+        files = {"generated 60-page CV": make_text_pdf([[f"{line} {p}" for line in SAMPLE_PAGE] for p in range(60)])}
+
+    for name, data in files.items():
+        start = time.perf_counter()
+        old_parse(data)
+        old = time.perf_counter() - start
+        print(f"{name}: serial pdfplumber + list scans {old:6.3f}s")
+        for backend in BACKENDS:
+            _cache.clear()
+            start = time.perf_counter()
+            result = parse_profile_pdf(data, backend)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            parse_profile_pdf(data, backend)
+            warm = time.perf_counter() - start
+            print(f"  {backend:<10} {MAX_WORKERS} workers: {cold:6.3f}s, cached {warm * 1000:6.2f} ms "
+                  f"({len(result['skills'])} skills, {len(result['experience'])} experience lines)")
@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+
+# Groq answers 429 when over its per-minute limits and 5xx on transient failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# free tier limits for llama-3.1-8b-instant
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 6000
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at rate_per_minute / 60 tokens per second."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        # a small burst keeps any 60s window close to the per-minute limit
+        self.capacity = capacity or max(1.0, rate_per_minute / 10.0)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                wait = (amount - self._level) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits, as enforced by the Groq API."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens=0):
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+
+def estimate_tokens(text, completion_tokens=256):
+    """Rough prompt + completion token count (~4 characters per token)."""
+    return len(text) // 4 + 1 + completion_tokens
+
+
+def status_code_of(exc):
+    """HTTP status of an API error from groq, langchain or requests, if any."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(exc):
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return status_code_of(exc) in RETRYABLE_STATUS
+
+
+def _retry_after(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(fn, retries=5, base_delay=1.0, max_delay=30.0, on_retry=None):
+    """
+    Call fn(), retrying on 429/5xx with exponential backoff and full jitter.
+    A Retry-After header on the error takes precedence over the computed delay.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if on_retry:
+                on_retry(e, attempt + 1)
+            time.sleep(delay)
+
+
+def limited_call(fn, model, limiter, tokens, on_retry=None):
+    """
+    fn() under limiter, retried on 429/5xx. A model whose requests go through
+    llm_client.LLMClient (chat_model.ClientChatModel) is limited and retried by
+    the client already, so fn just runs once: every request passes exactly one
+    limiter and one retry loop.
+    """
+    if getattr(model, "client", None) is not None:
+        return fn()
+
+    def attempt():
+        limiter.acquire(tokens)
+        return fn()
+    return call_with_retry(attempt, on_retry=on_retry)
@@ -0,0 +1,79 @@
+import threading
+
+# Process-wide registry of expensive shared objects (LLM clients, the few-shot
+# corpus, ...). Each is built on first use and then reused by every caller, so a
+# Streamlit rerun or a new session never reconstructs them. Modules stay
+# importable without Streamlit; main.py's "Reload resources" button calls
+# invalidate() to rebuild them after a config or data change. A dropped instance
+# is not closed on the spot: background jobs may still be using it. Objects that
+# hold connections (the LLM client, the response cache) close them through a
+# weakref.finalize once the last holder lets go. Resources built from others
+# (depends_on) are dropped together with them, so the chat model never keeps
+# pointing at a client or cache that has been replaced.
+
+_registry = {}
+_lock = threading.RLock()
+
+
+class SharedResource:
+    """Lazily built singleton: call it to get the instance, invalidate() to drop it."""
+
+    def __init__(self, factory, name=None, depends_on=()):
+        self.factory = factory
+        self.name = name or factory.__name__
+        self.dependents = []
+        for resource in depends_on:
+            resource.dependents.append(self)
+        self._instance = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._instance = self.factory()
+                    self._built = True
+        return self._instance
+
+    @property
+    def built(self):
+        return self._built
+
+    def invalidate(self):
+        with self._lock:
+            self._instance = None
+            self._built = False
+        for resource in self.dependents:
+            resource.invalidate()
+
+
+def shared(factory=None, *, depends_on=()):
+    """
+    Decorator: register factory as a shared resource and return its getter.
+    depends_on: getters of the resources the factory builds on; invalidating one
+    of them also drops this one. Use as @shared or @shared(depends_on=(...)).
+    """
+    def register(factory):
+        resource = SharedResource(factory, f"{factory.__module__}.{factory.__name__}", depends_on)
+        with _lock:
+            _registry[resource.name] = resource
+        return resource
+    return register(factory) if factory is not None else register
+
+
+def invalidate(name=None):
+    """
+    Drop one resource (by "module.factory" name, with the resources built on it)
+    or all of them; they are rebuilt on next use.
+    """
+    with _lock:
+        resources = [_registry[name]] if name else list(_registry.values())
+    for resource in resources:
+        resource.invalidate()
+
+
+def status():
+    """{name: built?} for every registered resource."""
+    with _lock:
+        return {name: resource.built for name, resource in _registry.items()}
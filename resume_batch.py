@@ -0,0 +1,172 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from profile_parser import MAX_WORKERS, extract_pages, parse_profile_text
+
+# Batch résumé ingestion: parse every PDF in a directory or zip with the same
+# engine as the "Analyze Profile" tab, without the Streamlit UI.
+#   python resume_batch.py resumes.zip --jsonl profiles.jsonl --db --workers 8
+# Files are parsed in worker processes with at most IN_FLIGHT_PER_WORKER files
+# per worker queued at a time, so memory stays flat however large the batch is.
+
+IN_FLIGHT_PER_WORKER = 2
+TASKS_PER_CHILD = 200   # recycle workers now and then so native-library leaks can't grow
+DB_BATCH = 100
+
+
+def list_sources(source):
+    """Names of the PDFs in a directory (recursively) or a zip file, sorted."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return sorted(n for n in archive.namelist() if n.lower().endswith(".pdf") and not n.endswith("/"))
+    names = []
+    for root, _, files in os.walk(source):
+        names.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+    return sorted(names)
+
+
+def parse_resume(name, data, backend="pdfium"):
+    """Profile dict for one résumé; runs in a worker process. data: PDF bytes, or None to read the file name."""
+    try:
+        if data is None:
+            with open(name, "rb") as f:
+                data = f.read()
+        profile = parse_profile_text("\n".join(extract_pages(data, backend, workers=1)))
+        profile.pop("raw_text_preview")
+        return {"source": name, "content_hash": hashlib.sha256(data).hexdigest(), **profile}
+    except Exception as e:
+        return {"source": name, "error": f"{type(e).__name__}: {e}"}
+
+
+def iter_profiles(source, max_workers=MAX_WORKERS, backend="pdfium"):
+    """
+    Yield a profile dict per PDF in source (directory or zip) as each one finishes.
+    A file that fails has an "error" key instead of the parsed sections.
+    """
+    names = list_sources(source)
+    archive = zipfile.ZipFile(source) if zipfile.is_zipfile(source) else None
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                               max_tasks_per_child=TASKS_PER_CHILD)
+    pending = {}
+    try:
+        queue = iter(names)
+        while True:
+            # zip members are read here, only as workers free up
+            for name in queue:
+                data = archive.read(name) if archive else None
+                pending[pool.submit(parse_resume, name, data, backend)] = name
+                if len(pending) >= max_workers * IN_FLIGHT_PER_WORKER:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    # a worker crashed (e.g. out of memory); every queued file fails with it
+                    yield {"source": name, "error": "worker process crashed"}
+            if any(isinstance(f.exception(), BrokenProcessPool) for f in done):
+                pool.shutdown(cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                           max_tasks_per_child=TASKS_PER_CHILD)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if archive:
+            archive.close()
+
+
+def ingest_resumes(source, jsonl_path=None, to_db=False, max_workers=MAX_WORKERS, backend="pdfium",
+                   on_progress=None):
+    """
+    Parse every résumé in source and write the results to a JSONL file and/or the
+    profiles table in posts.db (as they arrive, in batches of DB_BATCH).
+    on_progress(done, total, failed) is called after each file.
+    Returns stats: files, parsed, failed, errors [(source, message)], stored, seconds, docs_per_sec.
+    """
+    if to_db:
+        from db import init_db, save_profiles
+        init_db()
+    total = len(list_sources(source))
+    stats = {"files": total, "parsed": 0, "failed": 0, "errors": [], "stored": 0}
+    batch = []
+    out = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+    start = time.perf_counter()
+    try:
+        for profile in iter_profiles(source, max_workers, backend):
+            if "error" in profile:
+                stats["failed"] += 1
+                stats["errors"].append((profile["source"], profile["error"]))
+            else:
+                stats["parsed"] += 1
+                if to_db:
+                    batch.append(profile)
+            if out:
+                out.write(json.dumps(profile, ensure_ascii=False) + "\n")
+            if len(batch) >= DB_BATCH:
+                stats["stored"] += save_profiles(batch)
+                batch = []
+            if on_progress:
+                on_progress(stats["parsed"] + stats["failed"], total, stats["failed"])
+        if batch:
+            stats["stored"] += save_profiles(batch)
+    finally:
+        if out:
+            out.close()
+    stats["seconds"] = time.perf_counter() - start
+    stats["docs_per_sec"] = total / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from profile_parser import SAMPLE_PAGE, make_text_pdf
+
+    parser = argparse.ArgumentParser(description="Parse a directory or zip of résumé PDFs.")
+    parser.add_argument("source", nargs="?", help="directory or .zip of PDFs")
+    parser.add_argument("--jsonl", help="write one JSON profile per line to this file")
+    parser.add_argument("--db", action="store_true", help="store profiles in posts.db")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--backend", choices=["pdfium", "pdfplumber"], default="pdfium")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="benchmark on N generated 3-page résumés (plus one corrupt file) in a temp zip")
+    args = parser.parse_args()
+
+    source = args.source
+    if args.generate:
+        source = os.path.join(tempfile.mkdtemp(), "resumes.zip")
+        with zipfile.ZipFile(source, "w") as archive:
+            for i in range(args.generate):
+                pages = [[f"{line} {i}" for line in SAMPLE_PAGE] for _ in range(3)]
+                archive.writestr(f"resume_{i:05d}.pdf", make_text_pdf(pages))
+            archive.writestr("corrupt.pdf", b"%PDF-1.4 truncated")
+    if not source:
+        parser.error("source is required (or use --generate N)")
+
+    start = last = time.perf_counter()
+
+    def print_progress(done, total, failed):
+        global last
+        now = time.perf_counter()
+        if now - last < 0.5 and done < total:
+            return
+        last = now
+        eta = (total - done) * (now - start) / done
+        print(f"\r[{done:>6}/{total}] {done / (now - start):7.1f} docs/s  {failed} failed  ETA {eta:5.0f}s",
+              end="", file=sys.stderr, flush=True)
+        if done == total:
+            print(file=sys.stderr)
+
+    stats = ingest_resumes(source, args.jsonl, args.db, args.workers, args.backend, on_progress=print_progress)
+    print(f"{stats['parsed']} parsed, {stats['failed']} failed, {stats['stored']} stored in "
+          f"{stats['seconds']:.1f}s ({stats['docs_per_sec']:.1f} docs/s, {args.workers} workers, {args.backend})")
+    for name, error in stats["errors"]:
+        print(f"  FAILED {name}: {error}")
@@ -0,0 +1,135 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce duplicate in-flight work: while fn is running for a key, other threads
+    calling do() with the same key wait for it and get the same result (or exception)
+    instead of starting their own call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Stream:
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def follow(self):
+        i = 0
+        while True:
+            with self.cond:
+                while i == len(self.chunks) and not self.done:
+                    self.cond.wait()
+                chunks, done, error = self.chunks[i:], self.done, self.error
+            i += len(chunks)
+            yield from chunks
+            if done and i == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class StreamFlight:
+    """
+    SingleFlight for streams: while create_stream() is being read for a key, other
+    callers with the same key get the same chunks as they arrive instead of opening
+    their own stream. The stream is read by a background thread, so a caller that
+    stops early (e.g. a cancelled job) doesn't cut it off for the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = {}
+        self.shared = 0
+
+    def stream(self, key, create_stream):
+        with self._lock:
+            call = self._streams.get(key)
+            if call is None:
+                call = self._streams[key] = _Stream()
+                threading.Thread(target=self._produce, args=(key, call, create_stream), daemon=True).start()
+            else:
+                self.shared += 1
+        return call.follow()
+
+    def _produce(self, key, call, create_stream):
+        try:
+            for chunk in create_stream():
+                with call.cond:
+                    call.chunks.append(chunk)
+                    call.cond.notify_all()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with call.cond:
+                call.done = True
+                call.cond.notify_all()
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    flight = StreamFlight()
+    started = []
+
+    def slow_stream():
+        started.append(1)
+        for word in ["one ", "two ", "three"]:
+            threading.Event().wait(0.05)
+            yield word
+
+    with ThreadPoolExecutor(5) as pool:
+        texts = list(pool.map(lambda _: "".join(flight.stream("k", slow_stream)), range(5)))
+    assert texts == ["one two three"] * 5, texts
+    assert len(started) == 1 and flight.shared == 4, (started, flight.shared)
+
+    # a caller that stops early doesn't cut the stream off for the others
+    started.clear()
+    first = flight.stream("k", slow_stream)
+    second = flight.stream("k", slow_stream)
+    assert next(first) == "one "
+    first.close()
+    assert "".join(second) == "one two three" and len(started) == 1
+    print("ok")
@@ -0,0 +1,263 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Shared SQLite layer for db.py and calendar_db.py.
+# One pool of long-lived connections per database file, all in WAL mode, so
+# concurrent Streamlit sessions can read while one of them writes.
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # safe with WAL, avoids an fsync per commit
+    "PRAGMA busy_timeout=5000",    # wait for the write lock instead of "database is locked"
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",    # 16 MB page cache per connection
+    "PRAGMA foreign_keys=ON",
+)
+
+POOL_SIZE = 8
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections to one database file."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # isolation_level=None: autocommit, transactions are opened explicitly in transaction()
+        # cached_statements: each connection keeps its prepared statements around
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _release(self, conn):
+        # never hand out a connection that is still inside a transaction
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        if conn.in_transaction:
+            # replace it rather than shrink the pool: other threads may be waiting on _idle
+            conn.close()
+            conn = self._connect()
+        self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self, attach=None):
+        """
+        A connection inside BEGIN IMMEDIATE ... COMMIT (rolled back on error, also a failed COMMIT).
+        attach: {schema name: path} of other database files to include in the transaction,
+        e.g. {"calendar": "content_calendar.db"} makes its tables calendar.<table>
+        """
+        with self.connection() as conn:
+            attached = []
+            try:
+                for name, path in (attach or {}).items():
+                    conn.execute("ATTACH DATABASE ? AS " + name, (path,))
+                    attached.append(name)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                    conn.execute("COMMIT")
+                except BaseException:
+                    if conn.in_transaction:
+                        try:
+                            conn.execute("ROLLBACK")
+                        except sqlite3.Error:
+                            pass  # _release() replaces the connection
+                    raise
+            finally:
+                # pooled connections go back without attachments (_release replaces one stuck in a transaction)
+                if not conn.in_transaction:
+                    for name in attached:
+                        conn.execute("DETACH DATABASE " + name)
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path):
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ConnectionPool(path)
+        return _pools[path]
+
+
+def execute(path, sql, params=()):
+    """Run one write statement in its own transaction; returns the cursor (lastrowid, rowcount)."""
+    with get_pool(path).transaction() as conn:
+        return conn.execute(sql, params)
+
+
+def executemany(path, sql, seq_of_params):
+    """Run a write statement for every parameter tuple in a single transaction; returns rows affected."""
+    with get_pool(path).transaction() as conn:
+        return conn.executemany(sql, seq_of_params).rowcount
+
+
+def query(path, sql, params=()):
+    with get_pool(path).connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def query_one(path, sql, params=()):
+    with get_pool(path).connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def transaction(path, attach=None):
+    """
+    Several statements in one transaction: `with storage.transaction(DB_FILE) as conn: ...`
+    attach: {schema name: path} of other databases written in the same transaction.
+    With WAL a rollback covers all of them, but a crash during COMMIT is only atomic per file.
+    """
+    return get_pool(path).transaction(attach)
+
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+
+def migrate(path, migrations):
+    """
+    Bring the database at path up to date, at most once per process.
+    migrations: list of migrations, each a list of SQL statements; migration i
+    takes the schema to version i + 1. The current version lives in PRAGMA
+    user_version, so only pending migrations run, each in its own transaction.
+    """
+    with _migrate_lock:
+        if path in _migrated:
+            return
+        if query_one(path, "PRAGMA user_version")[0] < len(migrations):
+            _apply_migrations(path, migrations)
+        _migrated.add(path)
+
+
+def _apply_migrations(path, migrations):
+    for version, statements in enumerate(migrations, start=1):
+        with transaction(path) as conn:
+            # re-read inside the write lock in case another process got here first
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+
+
+if __name__ == "__main__":
+    # Benchmark: pooled WAL storage vs. a fresh sqlite3.connect per statement,
+    # with several writer threads and one reader running at the same time.
+    import os
+    import tempfile
+    import time
+
+    WRITERS, ROWS, BATCH = 8, 500, 100
+    SCHEMA = "CREATE TABLE IF NOT EXISTS posts (id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT, tag TEXT)"
+    INSERT = "INSERT INTO posts (content, tag) VALUES (?, ?)"
+
+    def naive_insert(path, i):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute(INSERT, (f"post {i}", "bench"))
+        conn.commit()
+        conn.close()
+
+    def naive_read(path):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("SELECT * FROM posts ORDER BY id DESC LIMIT 20").fetchall()
+        conn.close()
+
+    def run(name, path, write, read):
+        stop = threading.Event()
+        reads = [0]
+
+        def reader():
+            while not stop.is_set():
+                read(path)
+                reads[0] += 1
+
+        def writer():
+            write(path)
+
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=writer) for _ in range(WRITERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reader_thread.join()
+        print(f"{name:<28} {WRITERS * ROWS / elapsed:>10,.0f} inserts/s {reads[0] / elapsed:>10,.0f} reads/s")
+
+    tmp = tempfile.mkdtemp()
+    paths = {name: os.path.join(tmp, f"{name}.db") for name in ("naive", "pooled", "batched")}
+    for path in paths.values():
+        conn = sqlite3.connect(path)
+        conn.execute(SCHEMA)
+        conn.close()
+
+    pooled_read = lambda path: query(path, "SELECT * FROM posts ORDER BY id DESC LIMIT 20")
+    run("connect per statement", paths["naive"],
+        lambda path: [naive_insert(path, i) for i in range(ROWS)], naive_read)
+    run("pooled, one row per txn", paths["pooled"],
+        lambda path: [execute(path, INSERT, (f"post {i}", "bench")) for i in range(ROWS)], pooled_read)
+    run(f"pooled, executemany({BATCH})", paths["batched"],
+        lambda path: [executemany(path, INSERT, [(f"post {i}", "bench") for i in range(j, j + BATCH)])
+                      for j in range(0, ROWS, BATCH)], pooled_read)
+
+    # a failed COMMIT (here a deferred foreign key violation) is rolled back, and
+    # the connection goes back to the pool outside any transaction
+    path = os.path.join(tmp, "commit.db")
+    pool = ConnectionPool(path, size=1)
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE parents (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE children (parent_id INTEGER REFERENCES parents (id) DEFERRABLE INITIALLY DEFERRED)")
+    try:
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO children VALUES (1)")
+        raise AssertionError("expected the COMMIT to fail")
+    except sqlite3.IntegrityError:
+        pass
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM children").fetchone()[0] == 0
+    with pool.transaction() as conn:
+        conn.execute("INSERT INTO parents VALUES (1)")
+        conn.execute("INSERT INTO children VALUES (1)")
+    print("failed COMMIT rolled back, next transaction ok")
@@ -1,7 +1,13 @@
 # summarizer.py
-from llm_helper import llm
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from llm_helper import get_llm, get_llm_uncached, get_response_cache
+from llm_cache import make_key
+from rate_limit import RateLimiter, estimate_tokens, limited_call
 try:
-    # if you're using LangChain's ChatGroq / messages
+    # if you're using a LangChain chat model / messages
     from langchain_core.messages import HumanMessage, SystemMessage
     USE_MESSAGES = True
 except Exception:
@@ -13,16 +19,185 @@ SYSTEM = (
     "Keep it crisp, no fluff."
 )
 
-def summarize_text(text: str, max_bullets: int = 6) -> str:
-    """Summarize long web page text into LinkedIn-friendly bullets."""
-    text = text[:12000]  # safety cut
+CHUNK_SYSTEM = (
+    "You summarize one part of a longer document. "
+    "Return up to 5 bullet points with the facts, figures and arguments of this part only. "
+    "No introduction, no conclusion."
+)
+
+# Long documents are summarized map-reduce style: the text is split at paragraph
+# boundaries into chunks of at most CHUNK_TOKENS, the chunks are summarized
+# concurrently, and the partial summaries are reduced into the final bullets.
+CHUNK_TOKENS = 3000        # ~12,000 characters, the old single-call cut
+CHUNK_PROMPT_VERSION = 1   # bump when CHUNK_SYSTEM changes so cached chunk summaries are not reused
+MAX_ROUNDS = 4             # reduce rounds before the final summary; 3000**4 tokens is far beyond any page
+ANCHOR_EVERY = 8           # on average, one paragraph in 8 may end a chunk early (see split_chunks)
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text):
+    """Rough token count (~4 characters per token), as in rate_limit.estimate_tokens."""
+    return len(text) // 4 + 1
+
+
+def _pieces(text, max_tokens):
+    """Paragraphs of text; a paragraph over max_tokens is split into sentences, then hard-cut."""
+    for paragraph in _PARAGRAPH.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for sentence in _SENTENCE.split(paragraph):
+            while count_tokens(sentence) > max_tokens:
+                yield sentence[:max_tokens * 4]
+                sentence = sentence[max_tokens * 4:]
+            if sentence:
+                yield sentence
+
+
+def split_chunks(text, max_tokens=CHUNK_TOKENS):
+    """
+    Pack paragraphs into chunks of at most max_tokens, never splitting a paragraph that fits.
+    Besides the size limit, a chunk over half full also ends after an "anchor"
+    paragraph, picked by a hash of its content. Boundaries therefore depend on the
+    text around them rather than on everything before, so an edit only changes the
+    chunks up to the next anchor and the rest keep their cached summaries.
+    """
+    chunks, current, size = [], [], 0
+    for piece in _pieces(text, max_tokens):
+        tokens = count_tokens(piece)
+        if current and size + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+        if size >= max_tokens // 2 and zlib.crc32(piece.encode("utf-8", "surrogatepass")) % ANCHOR_EVERY == 0:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _ask(model, system, prompt):
     if USE_MESSAGES:
-        resp = llm.invoke([
-            SystemMessage(content=SYSTEM),
-            HumanMessage(content=f"Summarize in {max_bullets} bullets:\n\n{text}")
-        ])
-        return resp.content
+        return model.invoke([SystemMessage(content=system), HumanMessage(content=prompt)]).content
+    # if llm is a simple callable that takes a prompt string
+    return model(f"{system}\n\n{prompt}")
+
+
+def summarize_chunks(chunks, model=None, max_workers=4, limiter=None, cache=None):
+    """
+    Summaries of chunks, in order, computed concurrently.
+    Each summary is cached under a hash of the model and the chunk's content, so
+    re-summarizing an edited document only re-runs the chunks that changed.
+    model: defaults to the uncached model, as the summaries are cached here already
+    Returns (summaries, stats).
+    """
+    model = model or get_llm_uncached()
+    limiter = limiter or RateLimiter()
+    cache = cache if cache is not None else get_response_cache()
+    llm_string = model._get_llm_string()
+
+    def task(chunk):
+        # returns (summary, from cache?, retries); counted below, not from the pool threads
+        key = make_key(llm_string, {"chunk_prompt": CHUNK_PROMPT_VERSION}, chunk)
+        summary = cache.get(key)
+        if summary is not None:
+            return summary, True, 0
+
+        retries = []
+        summary = limited_call(lambda: _ask(model, CHUNK_SYSTEM, f"Summarize this part:\n\n{chunk}"), model,
+                               limiter, estimate_tokens(chunk), on_retry=lambda error, attempt: retries.append(attempt))
+        cache.set(key, summary)
+        return summary, False, len(retries)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(task, chunks))
+    stats = {"chunks": len(chunks), "cached": sum(cached for _, cached, _ in results),
+             "retries": sum(retries for _, _, retries in results)}
+    return [summary for summary, _, _ in results], stats
+
+
+def map_reduce_summary(text, max_bullets=6, model=None, max_workers=4, limiter=None, cache=None,
+                       chunk_tokens=CHUNK_TOKENS):
+    """
+    Summarize text of any length into max_bullets bullets. Returns (summary, stats).
+    Partial summaries that together exceed chunk_tokens are reduced again in groups,
+    for at most MAX_ROUNDS rounds and only while the number of chunks goes down;
+    after that the final summary gets an equal share of chunk_tokens from each one.
+    """
+    start = time.perf_counter()
+    chunks = split_chunks(text, chunk_tokens)
+    stats = {"chunks": len(chunks), "cached": 0, "retries": 0, "llm_calls": 0, "rounds": 0}
+
+    while len(chunks) > 1 and stats["rounds"] < MAX_ROUNDS:
+        summaries, round_stats = summarize_chunks(chunks, model, max_workers, limiter, cache)
+        stats["rounds"] += 1
+        stats["cached"] += round_stats["cached"]
+        stats["retries"] += round_stats["retries"]
+        stats["llm_calls"] += round_stats["chunks"] - round_stats["cached"]
+        reduced = split_chunks("\n\n".join(summaries), chunk_tokens)
+        if len(reduced) >= len(chunks):
+            # the summaries didn't shrink (verbose model, chunk_tokens near the summary size)
+            chunks = summaries
+            break
+        chunks = reduced
+
+    if len(chunks) > 1:
+        share = chunk_tokens * 4 // len(chunks)
+        text = "\n\n".join(chunk[:share] for chunk in chunks)
     else:
-        # if llm is a simple callable that takes a prompt string
-        prompt = f"{SYSTEM}\n\nSummarize in {max_bullets} bullets:\n\n{text}"
-        return llm(prompt)
+        text = chunks[0] if chunks else ""
+
+    model = model or get_llm()
+    summary = limited_call(lambda: _ask(model, SYSTEM, f"Summarize in {max_bullets} bullets:\n\n{text}"), model,
+                           limiter or RateLimiter(), estimate_tokens(text))
+    stats["llm_calls"] += 1
+    stats["seconds"] = time.perf_counter() - start
+    return summary, stats
+
+
+def summarize_text(text: str, max_bullets: int = 6, model=None, max_workers: int = 4) -> str:
+    """Summarize long web page text into LinkedIn-friendly bullets."""
+    return map_reduce_summary(text, max_bullets, model=model, max_workers=max_workers)[0]
+
+
+if __name__ == "__main__":
+    # Benchmark on the fake LLM: a ~150k character article summarized with 1 and 8
+    # workers, then again after editing one paragraph (only its chunk is re-run).
+    import os
+    import tempfile
+    from fake_llm import FakeChatModel, summary_responder
+    from llm_cache import ResponseCache
+
+    paragraphs = [f"Paragraph {i}. " + f"Section {i} explains one idea about scaling content teams. " * 12
+                  for i in range(200)]
+    article = "\n\n".join(paragraphs)
+    unlimited = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    print(f"article: {len(article):,} characters, {len(split_chunks(article))} chunks")
+
+    for workers in (1, 8):
+        model = FakeChatModel(responder=summary_responder, latency=0.25, jitter=0.05)
+        cache = ResponseCache(os.path.join(tempfile.mkdtemp(), "chunks.db"))
+        summary, stats = map_reduce_summary(article, model=model, max_workers=workers, limiter=unlimited, cache=cache)
+        print(f"{workers} workers: {stats['seconds']:5.2f}s  {stats['llm_calls']} LLM calls  "
+              f"{stats['rounds']} map rounds")
+
+    paragraphs[100] = "Paragraph 100 was rewritten with new figures."
+    summary, stats = map_reduce_summary("\n\n".join(paragraphs), model=model, max_workers=8,
+                                        limiter=unlimited, cache=cache)
+    print(f"after editing one paragraph: {stats['seconds']:5.2f}s  {stats['llm_calls']} LLM calls  "
+          f"{stats['cached']} chunk summaries from cache")
+    print(summary)
+
+    # a model whose summaries don't shrink still finishes, in a bounded number of calls
+    verbose = FakeChatModel(responder=lambda messages: messages[-1].content.split(":\n\n", 1)[-1], latency=0)
+    summary, stats = map_reduce_summary(article, model=verbose, limiter=unlimited,
+                                        cache=ResponseCache(os.path.join(tempfile.mkdtemp(), "chunks.db")))
+    assert stats["rounds"] <= MAX_ROUNDS
+    print(f"non-shrinking summaries: stopped after {stats['rounds']} round(s), {stats['llm_calls']} LLM calls")
@@ -0,0 +1,300 @@
+import difflib
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import PromptTemplate
+from llm_helper import get_llm
+from rate_limit import RateLimiter, estimate_tokens, limited_call
+
+# Tag unification for preprocess.py, in stages so it scales past one prompt:
+# 1. tags already unified on an earlier run come from the stored tag map;
+# 2. spelling variants (case, hashtags, camelCase, punctuation, plurals) are
+#    merged locally, and onto an existing unified tag when one matches; so are
+#    near-duplicates within a string similarity cluster ("Carrer Growth");
+# 3. what is left goes to the LLM in size-bounded batches, run concurrently
+#    under the rate limiter. Similar-looking tags (string similarity clusters)
+#    are packed into the same batch so the LLM sees them side by side.
+
+MAX_BATCH_TAGS = 80
+MAX_BATCH_CHARS = 1500
+MAX_HINTS = 60          # existing unified tags shown to every batch, most used first
+SIMILARITY = 0.8        # difflib ratio for putting two tags in the same batch
+MERGE_SIMILARITY = 0.9  # difflib ratio for merging two tags without asking the LLM (typos)
+WINDOW = 4              # neighbours compared in each sorted order
+
+UNIFY_TEMPLATE = '''I will give you a list of tags. You need to unify tags with the following requirements,
+    1. Tags are unified and merged to create a shorter list.
+       Example 1: "Jobseekers", "Job Hunting" can be all merged into a single tag "Job Search".
+       Example 2: "Motivation", "Inspiration", "Drive" can be mapped to "Motivation"
+       Example 3: "Personal Growth", "Personal Development", "Self Improvement" can be mapped to "Self Improvement"
+       Example 4: "Scam Alert", "Job Scam" etc. can be mapped to "Scams"
+    2. Each tag should be follow title case convention. example: "Motivation", "Job Search"
+    3. Output should be a JSON object, No preamble
+    3. Output should have mapping of original tag and the unified tag.
+       For example: {{"Jobseekers": "Job Search",  "Job Hunting": "Job Search", "Motivation": "Motivation}}
+    4. Prefer these existing unified tags where one fits: {existing}
+
+    Here is the list of tags:
+    {tags}
+    '''
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_NON_DIGITS = re.compile(r"\D")
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _words(tag):
+    return _WORD.findall(_CAMEL.sub(" ", tag))
+
+
+def _lemma(word):
+    # plural -> singular, enough to merge "Jobs"/"Job" and "Opportunities"/"Opportunity"
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tag_key(tag):
+    """Spelling-insensitive key: "#JobSearch", "job-search" and "Job Searches" all give "jobsearch"."""
+    return "".join(_lemma(w) for w in (w.lower() for w in _words(tag)))
+
+
+def display_name(tag):
+    """Title case, keeping acronyms: "#remoteWork" -> "Remote Work", "AI tools" -> "AI Tools"."""
+    return " ".join(w if w.isupper() else w.capitalize() for w in _words(tag)) or tag.strip()
+
+
+def _similar(a, b, threshold=SIMILARITY):
+    return difflib.SequenceMatcher(None, a, b).ratio() >= threshold
+
+
+def _typo(a, b):
+    # close spellings are the same tag unless their numbers differ ("Web2"/"Web3", "Q3 Goals"/"Q4 Goals")
+    return _similar(a, b, MERGE_SIMILARITY) and _NON_DIGITS.sub("", a) == _NON_DIGITS.sub("", b)
+
+
+def similarity_clusters(keys):
+    """
+    Group keys whose strings are similar (difflib ratio >= SIMILARITY), comparing
+    each key only with its WINDOW neighbours in sorted and reverse-sorted order.
+    Returns a list of clusters (lists of keys), each in sorted order.
+    """
+    parent = {key: key for key in keys}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for order in (sorted(keys), sorted(keys, key=lambda k: k[::-1])):
+        for i, a in enumerate(order):
+            for b in order[i + 1:i + 1 + WINDOW]:
+                if _similar(a, b):
+                    parent[find(a)] = find(b)
+
+    clusters = {}
+    for key in sorted(keys):
+        clusters.setdefault(find(key), []).append(key)
+    return list(clusters.values())
+
+
+def merge_near_duplicates(pending, unified_by_key, counts):
+    """
+    Merge pending groups ({key: tags}) whose keys are near-identical (MERGE_SIMILARITY,
+    same numbers) within a similarity cluster: onto a known unified tag's key when one matches,
+    else onto the most used key. Merged groups are removed from pending and added
+    to the surviving group; returns {tag: unified tag} for the ones merged onto known tags.
+    """
+    weight = {key: sum(counts[tag] for tag in members) for key, members in pending.items()}
+    local = {}
+    for cluster in similarity_clusters(list(pending) + [key for key in unified_by_key if key not in pending]):
+        if len(cluster) < 2:
+            continue
+        anchors = [key for key in cluster if key in unified_by_key]
+        for key in sorted((key for key in cluster if key in pending), key=lambda k: -weight[k]):
+            match = next((anchor for anchor in anchors if _typo(key, anchor)), None)
+            if match is None:
+                anchors.append(key)
+            elif match in unified_by_key:
+                local.update((tag, unified_by_key[match]) for tag in pending.pop(key))
+            else:
+                pending[match].extend(pending.pop(key))
+    return local
+
+
+def pack_batches(clusters, names):
+    """Lists of tag names, at most MAX_BATCH_TAGS / MAX_BATCH_CHARS each, keeping clusters together."""
+    batches, batch, size = [], [], 0
+    for cluster in clusters:
+        for key in cluster:
+            name = names[key]
+            if batch and (len(batch) >= MAX_BATCH_TAGS or size + len(name) > MAX_BATCH_CHARS):
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(name)
+            size += len(name) + 1
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def unify_batch(tags, existing=(), model=None):
+    """One LLM call: {tag: unified tag} for a batch of tags."""
+    pt = PromptTemplate.from_template(UNIFY_TEMPLATE)
+    chain = pt | (model or get_llm())
+    response = chain.invoke(input={"tags": ",".join(tags), "existing": ", ".join(existing) or "(none yet)"})
+    try:
+        json_parser = JsonOutputParser()
+        res = json_parser.parse(response.content)
+    except OutputParserException:
+        raise OutputParserException("Unable to parse the tag mapping.")
+    return res
+
+
+def unify_tags(tags, model=None, store=None, max_workers=8, limiter=None):
+    """
+    Map every tag (an iterable of tags as they occur in posts, repeats counted for
+    ranking) to its unified tag. With a store (checkpoint.CheckpointStore), earlier
+    results are reused and new ones saved.
+    Returns ({tag: unified tag}, stats).
+    """
+    start = time.perf_counter()
+    counts = Counter(tags)
+    known = store.get_tag_map() if store is not None else {}
+    mapping = {tag: known[tag] for tag in counts if tag in known}
+    # known: from the stored map; local: merged without the LLM; llm_tags: distinct tags sent to it
+    stats = {"tags": len(counts), "known": len(mapping), "local": 0, "llm_tags": 0, "llm_calls": 0,
+             "retries": 0, "unanswered": 0, "errors": []}
+
+    # stage 2: group the new tags by spelling-insensitive key
+    groups = {}
+    for tag, _ in counts.most_common():
+        if tag not in mapping:
+            groups.setdefault(tag_key(tag), []).append(tag)
+    unified_by_key = {}
+    for tag, unified in known.items():
+        unified_by_key.setdefault(tag_key(unified), unified)
+        unified_by_key.setdefault(tag_key(tag), unified)
+
+    local, pending = {}, {}
+    for key, members in groups.items():
+        if key in unified_by_key or not key:
+            unified = unified_by_key.get(key) or display_name(members[0])
+            local.update((tag, unified) for tag in members)
+        else:
+            pending[key] = members
+    local.update(merge_near_duplicates(pending, unified_by_key, counts))
+    stats["local"] = len(local) + sum(len(members) - 1 for members in pending.values())
+
+    # stage 3: the most used spelling of each pending group goes to the LLM
+    names = {key: display_name(members[0]) for key, members in pending.items()}
+    batches = pack_batches(similarity_clusters(list(pending)), names)
+    hints = [unified for unified, _ in Counter(known[t] for t in counts if t in known).most_common(MAX_HINTS)]
+    model = model or get_llm()
+    limiter = limiter or RateLimiter()
+
+    def on_retry(error, attempt):
+        stats["retries"] += 1
+
+    def task(batch):
+        prompt = UNIFY_TEMPLATE + ",".join(batch) + ", ".join(hints)
+        # the answer repeats every tag next to its unified tag
+        return limited_call(lambda: unify_batch(batch, hints, model=model), model, limiter,
+                            estimate_tokens(prompt, completion_tokens=12 * len(batch)), on_retry=on_retry)
+
+    answers = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(task, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            stats["llm_calls"] += 1
+            try:
+                answers.update(future.result())
+            except Exception as e:
+                stats["errors"].append((futures[future], e))
+
+    # batches answer independently: spellings of the same unified tag collapse to the first one
+    canonical = {}
+    for unified in list(unified_by_key.values()) + list(answers.values()):
+        if isinstance(unified, str) and unified.strip():
+            canonical.setdefault(tag_key(unified), unified.strip())
+    # the answer may spell a tag differently from the prompt ("job search" for "Job Search")
+    answers_by_key = {tag_key(tag): unified for tag, unified in answers.items() if isinstance(tag, str)}
+    learned = {}
+    for key, members in pending.items():
+        answer = answers_by_key.get(key)
+        if isinstance(answer, str) and answer.strip():
+            unified = canonical[tag_key(answer)]
+            learned.update((tag, unified) for tag in members)
+        else:
+            # failed batch, or the LLM skipped it: keep its own name for now but don't
+            # store it, so the next run asks again
+            stats["unanswered"] += 1
+            mapping.update((tag, names[key]) for tag in members)
+    stats["llm_tags"] = len(pending)
+
+    if store is not None:
+        store.put_tag_map(local, "local")
+        store.put_tag_map(learned, "llm")
+    mapping.update(local)
+    mapping.update(learned)
+    stats["seconds"] = time.perf_counter() - start
+    return mapping, stats
+
+
+if __name__ == "__main__":
+    # Benchmark: 20k tag spellings of 600 concepts, unified against a fake LLM
+    # (200 ms per call), first from scratch, then with 300 new tags on top.
+    import os
+    import random
+    import tempfile
+    from checkpoint import CheckpointStore
+    from fake_llm import FakeChatModel, preprocess_responder
+
+    random.seed(3)
+    words = ["job", "career", "data", "remote", "team", "growth", "sales", "brand", "health", "design",
+             "startup", "market", "product", "skill", "leader", "network", "mentor", "money", "study", "code"]
+    concepts = list({f"{a} {b}" for a in words for b in words if a != b})[:600]
+
+    def spelling(concept):
+        a, b = concept.split()
+        return random.choice([
+            concept, concept.title(), f"#{a}{b.title()}", f"{a.title()} {b.title()}s", f"{a}-{b}",
+            f"{a.upper()} {b}", f"{a} {b}s", f"#{a.title()}{b.title()}"
+        ])
+
+    tags = [spelling(random.choice(concepts)) for _ in range(20000)]
+    prompt_chars = len(",".join(set(tags)))
+    model = FakeChatModel(responder=preprocess_responder, latency=0.2)
+    unlimited = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    store = CheckpointStore(os.path.join(tempfile.mkdtemp(), "bench.checkpoint.db"))
+
+    print(f"{len(set(tags))} distinct tags: one prompt would be {prompt_chars} characters "
+          f"(~{prompt_chars // 4} tokens) and wait on a single call")
+    mapping, stats = unify_tags(tags, model=model, store=store, limiter=unlimited)
+    print(f"first run:   {stats['local']} merged locally, {stats['llm_tags']} tags in {stats['llm_calls']} "
+          f"LLM calls, {len(set(mapping.values()))} unified tags, {stats['seconds']:.2f}s")
+    more = tags + [spelling(f"{w} extra{i}") for i, w in enumerate(random.choices(words, k=300))]
+    mapping, stats = unify_tags(more, model=model, store=store, limiter=unlimited)
+    print(f"second run:  {stats['known']} from the stored map, {stats['local']} merged locally, "
+          f"{stats['llm_tags']} tags in {stats['llm_calls']} LLM calls, {stats['seconds']:.2f}s")
+
+    # typos are merged without the LLM, and answers are matched by tag_key
+    checks = ["Career Growth"] * 5 + ["Carrer Growth", "Remote Work", "remote  work"]
+    answer_model = FakeChatModel(responder=lambda messages: '{"career growth": "Career Growth", '
+                                                            '"REMOTE WORK": "Remote Work"}', latency=0)
+    store = CheckpointStore(os.path.join(tempfile.mkdtemp(), "check.checkpoint.db"))
+    mapping, stats = unify_tags(checks, model=answer_model, store=store, limiter=unlimited)
+    assert mapping["Carrer Growth"] == "Career Growth" and stats["llm_tags"] == 2, (mapping, stats)
+    assert stats["unanswered"] == 0 and store.get_tag_map()["Remote Work"] == "Remote Work"
+    # a tag missing from the answer is not stored, so the next run asks again
+    mapping, stats = unify_tags(checks + ["Data Science"], model=answer_model, store=store, limiter=unlimited)
+    assert stats["unanswered"] == 1 and "Data Science" not in store.get_tag_map()
+    print("typo merged locally, answers matched by key, unanswered tags retried")
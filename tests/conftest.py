@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# the modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def posts_db(tmp_path, monkeypatch):
+    """db.py and calendar_db.py pointed at fresh databases under tmp_path."""
+    import calendar_db
+    import db
+
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "posts.db"))
+    monkeypatch.setattr(calendar_db, "DB_FILE", str(tmp_path / "content_calendar.db"))
+    db.init_db()
+    calendar_db.init_calendar_db()
+    return db
@@ -0,0 +1,20 @@
+from dedup import find_duplicates
+
+
+def test_edited_copy_points_at_original():
+    original = " ".join(f"word{i}" for i in range(80))
+    edited = original.replace("word40", "changed").replace("word41", "words")
+    other = " ".join(f"other{i}" for i in range(80))
+    assert find_duplicates([original, other, edited]) == [None, None, 0]
+
+
+def test_texts_without_words_only_match_exact_copies():
+    assert find_duplicates(["🚀🚀🚀", "🎉🎉", "...", "🚀🚀🚀", "!!!"]) == [None, None, None, 0, None]
+
+
+def test_saved_duplicate_is_flagged(posts_db):
+    text = "Five lessons from ten years of hiring engineers: " + " ".join(f"lesson{i}" for i in range(40))
+    first = posts_db.save_post(text, "Hiring", "Medium", "English")
+    second = posts_db.save_post(text + " Thoughts?", "Hiring", "Medium", "English")
+    assert posts_db.get_duplicate_of(second) == first
+    assert posts_db.save_post(text, "Hiring", "Medium", "English", on_duplicate="skip") == first
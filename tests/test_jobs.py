@@ -0,0 +1,76 @@
+import os
+import threading
+
+import pytest
+
+import jobs
+
+
+@jobs.task("test_echo")
+def echo(job, text):
+    job.progress(1.0, "done")
+    return text.upper()
+
+
+@jobs.task("test_file_size")
+def file_size(job, data):
+    with open(data, "rb") as f:
+        return len(f.read())
+
+
+_release = threading.Event()
+
+
+@jobs.task("test_block")
+def block(job):
+    _release.wait(5)
+    job.check_cancelled()
+    return "finished"
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"), max_workers=1)
+    yield queue
+    _release.set()
+    queue.close()
+
+
+def test_submit_and_wait(queue):
+    job_id = queue.submit("test_echo", owner="me", text="hello")
+    job = queue.wait(job_id, timeout=5)
+    assert job["status"] == jobs.DONE and job["result"] == "HELLO" and job["args"] == {"text": "hello"}
+    assert [job["id"] for job in queue.list_jobs(owner="me")] == [job_id]
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("no_such_kind")
+
+
+def test_listing_leaves_out_args(queue):
+    job_id = queue.submit("test_echo", owner="me", text="x" * 100000)
+    queue.wait(job_id, timeout=5)
+    assert "args" not in queue.list_jobs(owner="me")[0]
+
+
+def test_uploads_are_files_removed_after_the_job(queue):
+    job_id = queue.submit("test_file_size", files={"data": b"%PDF" * 1000})
+    job = queue.wait(job_id, timeout=5)
+    assert job["result"] == 4000
+    assert job["args"]["data"].startswith(queue.uploads_dir)
+    assert not os.path.exists(os.path.join(queue.uploads_dir, job_id))
+
+
+def test_cancel_queued_and_running(queue):
+    _release.clear()
+    running = queue.submit("test_block")
+    queued = queue.submit("test_file_size", files={"data": b"x"})
+    assert queue.cancel(queued)
+    assert queue.get(queued)["status"] == jobs.CANCELLED
+    assert not os.path.exists(os.path.join(queue.uploads_dir, queued))
+
+    assert queue.cancel(running)
+    _release.set()
+    assert queue.wait(running, timeout=5)["status"] == jobs.CANCELLED
+    assert not queue.cancel(running)
@@ -0,0 +1,89 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import calendar_db
+import storage
+
+
+def _walk(get_page, **filters):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = get_page(limit=7, cursor=cursor, **filters)
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows, pages
+
+
+def test_posts_pages_are_newest_first_without_gaps(posts_db):
+    posts_db.save_posts([{"content": f"post number {i} about topic {i % 3}", "tag": f"tag{i % 3}",
+                          "length": "Short", "language": "English" if i % 2 else "Hinglish"}
+                         for i in range(50)])
+    # several posts share a created_at second, so the id tie-break matters
+    storage.execute(posts_db.DB_FILE, "UPDATE posts SET created_at = '2025-01-0' || (1 + id % 5) || ' 10:00:00'")
+
+    rows, pages = _walk(posts_db.get_posts_page)
+    assert pages == 8 and len(rows) == 50
+    assert len({row[0] for row in rows}) == 50
+    assert [(row[6], row[0]) for row in rows] == sorted(((row[6], row[0]) for row in rows), reverse=True)
+
+    rows, _ = _walk(posts_db.get_posts_page, tag="tag1", language="English")
+    assert len(rows) == posts_db.count_posts(tag="tag1", language="English") > 0
+    assert all(row[2] == "tag1" and row[4] == "English" for row in rows)
+
+    rows, _ = _walk(posts_db.get_posts_page, since="2025-01-02", until="2025-01-03")
+    assert len(rows) == posts_db.count_posts(since="2025-01-02", until="2025-01-03") == 20
+
+
+def test_calendar_pages_are_in_date_order(posts_db):
+    calendar_db.add_calendar_entries({"title": f"entry {i}", "date": f"2025-03-{1 + i % 10:02d}",
+                                      "status": "Planned" if i % 4 else "Completed"} for i in range(30))
+    rows, pages = _walk(calendar_db.get_entries_page)
+    assert pages == 5 and len({row[0] for row in rows}) == 30
+    assert [(row[3], row[0]) for row in rows] == sorted((row[3], row[0]) for row in rows)
+
+    rows, _ = _walk(calendar_db.get_entries_page, status="Completed", start_date="2025-03-03")
+    assert len(rows) == calendar_db.count_entries(status="Completed", start_date="2025-03-03")
+    assert all(row[4] == "Completed" and row[3] >= "2025-03-03" for row in rows)
+
+
+@pytest.fixture
+def capped_api():
+    """A LinkedIn-like collection of 120 skills whose server returns at most `cap` per page."""
+    skills = [{"name": f"Skill {i}"} for i in range(120)]
+    state = {"cap": 10}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            start, count = int(query["start"][0]), int(query["count"][0])
+            count = min(count, state["cap"])
+            data = json.dumps({"elements": skills[start:start + count],
+                               "paging": {"start": start, "count": count, "total": len(skills)}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", skills, state
+    server.shutdown()
+
+
+@pytest.mark.parametrize("cap", [10, 50, 7])
+def test_iter_elements_follows_what_the_server_returns(capped_api, cap):
+    from profile_analysis import iter_elements
+
+    base, skills, state = capped_api
+    state["cap"] = cap
+    assert list(iter_elements("/skills", "token", base_url=base, page_size=50)) == skills
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "test.db")
+    storage.execute(path, "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    return path
+
+
+def test_execute_and_query(path):
+    storage.execute(path, "INSERT INTO items (name) VALUES (?)", ("a",))
+    assert storage.executemany(path, "INSERT INTO items (name) VALUES (?)", [("b",), ("c",)]) == 2
+    assert storage.query(path, "SELECT name FROM items ORDER BY id") == [("a",), ("b",), ("c",)]
+    assert storage.query_one(path, "SELECT COUNT(*) FROM items") == (3,)
+
+
+def test_transaction_rolls_back_on_error(path):
+    with pytest.raises(RuntimeError):
+        with storage.transaction(path) as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+            raise RuntimeError("boom")
+    assert storage.query_one(path, "SELECT COUNT(*) FROM items") == (0,)
+
+
+def test_failed_commit_is_rolled_back(tmp_path):
+    pool = storage.ConnectionPool(str(tmp_path / "commit.db"), size=1)
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE parents (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE children (parent_id INTEGER REFERENCES parents (id) "
+                     "DEFERRABLE INITIALLY DEFERRED)")
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO children VALUES (1)")
+    # the one pooled connection comes back outside any transaction
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM children").fetchone() == (0,)
+
+
+def test_attached_database_commits_and_rolls_back_together(path, tmp_path):
+    other = str(tmp_path / "other.db")
+    storage.execute(other, "CREATE TABLE notes (text TEXT NOT NULL)")
+
+    with storage.transaction(path, attach={"other": other}) as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('a')")
+        conn.execute("INSERT INTO other.notes (text) VALUES ('for a')")
+    with pytest.raises(sqlite3.IntegrityError):
+        with storage.transaction(path, attach={"other": other}) as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('b')")
+            conn.execute("INSERT INTO other.notes (text) VALUES (NULL)")
+
+    assert storage.query(path, "SELECT name FROM items") == [("a",)]
+    assert storage.query(other, "SELECT text FROM notes") == [("for a",)]
+    # pooled connections are detached again
+    assert [row[1] for row in storage.query(path, "PRAGMA database_list")] == ["main"]
+
+
+def test_migrate_applies_only_pending_migrations(tmp_path):
+    path = str(tmp_path / "migrated.db")
+    migrations = [["CREATE TABLE a (x)"], ["CREATE TABLE b (y)", "CREATE INDEX idx_b ON b (y)"]]
+    storage.migrate(path, migrations[:1])
+    assert storage.query_one(path, "PRAGMA user_version") == (1,)
+
+    # a later release appends a migration; only that one runs
+    storage._migrated.discard(path)
+    storage.migrate(path, migrations)
+    assert storage.query_one(path, "PRAGMA user_version") == (2,)
+    tables = {row[0] for row in storage.query(path, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"a", "b"} <= tables
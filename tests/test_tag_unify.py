@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from checkpoint import CheckpointStore
+from fake_llm import FakeChatModel
+from rate_limit import RateLimiter
+from tag_unify import tag_key, unify_tags
+
+UNLIMITED = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+
+def fake_model(answer):
+    return FakeChatModel(responder=lambda messages: json.dumps(answer), latency=0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "tags.checkpoint.db"))
+    yield store
+    store.close()
+
+
+def test_tag_key_ignores_spelling():
+    assert tag_key("#JobSearch") == tag_key("job-search") == tag_key("Job Searches")
+
+
+def test_spelling_variants_and_typos_are_merged_locally(store):
+    tags = ["Career Growth"] * 3 + ["#careerGrowth", "Carrer Growth", "Remote Work"]
+    mapping, stats = unify_tags(tags, model=fake_model({"Career Growth": "Career Growth",
+                                                        "Remote Work": "Remote Work"}),
+                                store=store, limiter=UNLIMITED)
+    assert mapping["#careerGrowth"] == mapping["Carrer Growth"] == "Career Growth"
+    assert stats["llm_tags"] == 2
+
+
+def test_numbers_keep_tags_apart(store):
+    mapping, stats = unify_tags(["Web2", "Web3"], model=fake_model({"Web2": "Web2", "Web3": "Web3"}),
+                                store=store, limiter=UNLIMITED)
+    assert mapping == {"Web2": "Web2", "Web3": "Web3"} and stats["llm_tags"] == 2
+
+
+def test_answers_are_matched_by_key(store):
+    mapping, stats = unify_tags(["Job Hunting"], model=fake_model({"job  hunting": "Job Search"}),
+                                store=store, limiter=UNLIMITED)
+    assert mapping == {"Job Hunting": "Job Search"} and stats["unanswered"] == 0
+    assert store.get_tag_map()["Job Hunting"] == "Job Search"
+
+
+def test_unanswered_tags_are_not_stored(store):
+    model = fake_model({"Motivation": "Motivation"})
+    mapping, stats = unify_tags(["Motivation", "Data Science"], model=model, store=store, limiter=UNLIMITED)
+    assert mapping["Data Science"] == "Data Science" and stats["unanswered"] == 1
+    assert "Data Science" not in store.get_tag_map()
+
+    # asked again on the next run
+    mapping, stats = unify_tags(["Motivation", "Data Science"], model=model, store=store, limiter=UNLIMITED)
+    assert stats["known"] == 1 and stats["llm_tags"] == 1
@@ -1,16 +1,28 @@
-import requests
-from bs4 import BeautifulSoup
+from fetcher import get_engine
 
 def summarize_url(url):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    """
+    Short summary of the page at url.
+    Raises requests.HTTPError for a 4xx/5xx response (the error page is not
+    summarized) and requests.RequestException when the page can't be fetched.
+    """
+    return get_engine().fetch_text(url, "summary", summarize_html)
 
-        # Simple text extraction
-        paragraphs = soup.find_all('p')
-        text = " ".join(p.get_text() for p in paragraphs[:5])  # first 5 paragraphs
-        summary = text[:300] + "..." if len(text) > 300 else text
+def summarize_html(html):
+    from bs4 import BeautifulSoup  # imported on first use; most pages come from the cache
 
-        return summary
-    except Exception as e:
-        return f"Error summarizing URL: {str(e)}"
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Simple text extraction
+    paragraphs = soup.find_all('p')
+    text = " ".join(p.get_text() for p in paragraphs[:5])  # first 5 paragraphs
+    summary = text[:300] + "..." if len(text) > 300 else text
+
+    return summary
+
+def summarize_urls(urls):
+    """
+    summarize_url for a whole reading list, fetched in parallel.
+    Returns summaries in input order, with the exception in place of a link that failed.
+    """
+    return get_engine().fetch_many_text(urls, "summary", summarize_html)
@@ -0,0 +1,268 @@
+import json
+import mmap
+import os
+import re
+import zlib
+import numpy as np
+
+# Similarity index over the few-shot corpus, for topics that match no tag exactly.
+# Posts are embedded on the CPU as hashed TF-IDF vectors (words signed-hashed
+# into DIM dimensions, L2-normalised) and stored as one contiguous int8 matrix
+# (one float scale per row), with rows grouped by k-means cluster (an inverted file). A query
+# scores the cluster centroids and only scans the NPROBE closest clusters, so a
+# lookup stays in the low milliseconds at hundreds of thousands of posts.
+# Same single-file layout as corpus.py: magic, JSON header, 8-byte aligned arrays.
+
+MAGIC = b"LIAVEC01"
+DIM = 256
+HASH_BITS = 20
+SIGN_BIT = 1 << 12   # above the bucket bits, so bucket and sign are independent
+NPROBE = 8
+EXACT_MAX = 4096     # smaller indexes are one cluster, i.e. an exact search
+BATCH = 16384
+
+_WORD = re.compile(r"\w\w+")
+
+_COLUMNS = [
+    # name, dtype
+    ("vectors", "i1"),
+    ("scales", "<f4"),
+    ("rows", "<u4"),
+    ("list_offsets", "<u8"),
+    ("centroids", "<f4"),
+    ("features", "<u4"),
+    ("idf", "<f4"),
+]
+
+
+def vectors_path_for(json_path):
+    """data/processed_posts.json -> data/processed_posts.vectors"""
+    return os.path.splitext(json_path)[0] + ".vectors"
+
+
+def _tokens(text):
+    # unigrams only: at DIM buckets, the many rare bigrams mostly add collision noise
+    return _WORD.findall(text.lower())
+
+
+def _hash_texts(texts):
+    """(doc ids, feature ids) of every token occurrence, as parallel arrays."""
+    ids, lengths, hashes = {}, [], []
+    for text in texts:
+        tokens = _tokens(text)
+        hashes.extend([ids[t] if t in ids else ids.setdefault(t, zlib.crc32(t.encode())) for t in tokens])
+        lengths.append(len(tokens))
+    docs = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    # crc32 is linear, so similar words get related bucket/sign bits; a multiplicative
+    # (Fibonacci) hash of it, keeping the high bits, breaks that up
+    hashes = np.array(hashes, dtype=np.uint64) * 0x9E3779B1 & 0xFFFFFFFF
+    return docs, (hashes >> (32 - HASH_BITS)).astype(np.int64)
+
+
+def _embed(docs, feats, weight, n):
+    """Rows of sign-hashed, L2-normalised vectors from per-(doc, feature) weights; docs sorted."""
+    vectors = np.zeros((n, DIM), dtype=np.float32)
+    signed = np.where(feats & SIGN_BIT, weight, -weight)
+    flat = docs * DIM + (feats % DIM)
+    bounds = np.searchsorted(docs, np.arange(0, n + BATCH, BATCH))
+    for start, (lo, hi) in zip(range(0, n, BATCH), zip(bounds, bounds[1:])):
+        stop = min(start + BATCH, n)
+        vectors[start:stop] = np.bincount(flat[lo:hi] - start * DIM, weights=signed[lo:hi],
+                                          minlength=(stop - start) * DIM).reshape(-1, DIM)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_corpus(texts):
+    """(vectors, features, idf) for a list of texts; features/idf are the sorted vocabulary hashes."""
+    n = len(texts)
+    docs, feats = _hash_texts(texts)
+    keys, tf = np.unique(docs << HASH_BITS | feats, return_counts=True)
+    docs, feats = keys >> HASH_BITS, keys & ((1 << HASH_BITS) - 1)
+    features, df = np.unique(feats, return_counts=True)
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    weight = (1 + np.log(tf)) * idf[np.searchsorted(features, feats)]
+    return _embed(docs, feats, weight, n), features.astype(np.uint32), idf
+
+
+def _kmeans(vectors, n_lists, iterations=8, seed=0):
+    """Spherical k-means centroids, fitted on a sample of at most 64 rows per cluster."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[np.sort(rng.choice(len(vectors), min(len(vectors), n_lists * 64), replace=False))]
+    sample = sample.astype(np.float32)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        present, starts = np.unique(assign[order], return_index=True)
+        centroids[present] = np.add.reduceat(sample[order], starts, axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def _quantize(vectors):
+    """int8 rows and the per-row scale that maps them back (row ~= int8 row * scale)."""
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+    return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def compile_index(texts, n_lists=None):
+    """Embed texts and encode the index file (rows keep the order of texts, i.e. corpus row ids)."""
+    n = len(texts)
+    vectors, features, idf = embed_corpus(texts)
+    if n_lists is None:
+        n_lists = 1 if n <= EXACT_MAX else int(np.sqrt(n))
+    n_lists = max(1, min(n_lists, n))
+    if n_lists == 1:
+        centroids = np.zeros((1, DIM), dtype=np.float32)
+        assign = np.zeros(n, dtype=np.int64)
+    else:
+        centroids = _kmeans(vectors, n_lists)
+        assign = np.concatenate([np.argmax(vectors[i:i + BATCH] @ centroids.T, axis=1)
+                                 for i in range(0, n, BATCH)])
+    rows = np.argsort(assign, kind="stable")
+    list_offsets = np.searchsorted(assign[rows], np.arange(n_lists + 1))
+    vectors, scales = _quantize(vectors[rows])
+
+    arrays = {
+        "vectors": vectors,
+        "scales": scales,
+        "rows": rows,
+        "list_offsets": list_offsets,
+        "centroids": centroids,
+        "features": features,
+        "idf": idf,
+    }
+    header = {"count": n, "dim": DIM, "lists": n_lists, "columns": {}}
+    body, offset = [], 0
+    for name, dtype in _COLUMNS:
+        data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+        header["columns"][name] = [offset, len(data)]
+        body.append(data)
+        pad = -len(data) % 8
+        body.append(b"\0" * pad)
+        offset += len(data) + pad
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(header_bytes) + 16) % 8)
+    return MAGIC + len(header_bytes).to_bytes(8, "little") + header_bytes + b"".join(body)
+
+
+def write_index(texts, path):
+    """Build the index for texts and write it atomically to path."""
+    data = compile_index(texts)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+class VectorIndex:
+    """Read-only view over a compiled index, backed by a file (mmap) or bytes."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:8]) != MAGIC:
+            raise ValueError("Not a compiled vector index file")
+        header_len = int.from_bytes(view[8:16], "little")
+        header = json.loads(bytes(view[16:16 + header_len]))
+        body = 16 + header_len
+
+        self.count = header["count"]
+        self.lists = header["lists"]
+        if header["dim"] != DIM:
+            raise ValueError(f"Index has {header['dim']} dimensions, expected {DIM}")
+        for name, dtype in _COLUMNS:
+            offset, size = header["columns"][name]
+            setattr(self, name, np.frombuffer(buffer, dtype=dtype, count=size // np.dtype(dtype).itemsize,
+                                              offset=body + offset))
+        self.vectors = self.vectors.reshape(-1, DIM)
+        self.centroids = self.centroids.reshape(-1, DIM)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_texts(cls, texts):
+        return cls(compile_index(texts))
+
+    def __len__(self):
+        return self.count
+
+    def embed(self, queries):
+        """Query vectors (len(queries) x DIM), weighted with the corpus IDF; unknown words are ignored."""
+        docs, feats = _hash_texts(queries)
+        keys, tf = np.unique(docs << HASH_BITS | feats, return_counts=True)
+        docs, feats = keys >> HASH_BITS, keys & ((1 << HASH_BITS) - 1)
+        pos = np.minimum(np.searchsorted(self.features, feats), max(len(self.features) - 1, 0))
+        known = self.features[pos] == feats if len(self.features) else np.zeros(len(feats), dtype=bool)
+        weight = np.where(known, (1 + np.log(tf)) * self.idf[pos] if len(self.idf) else 0.0, 0.0)
+        return _embed(docs, feats, weight, len(queries))
+
+    def search_many(self, queries, k=5, nprobe=NPROBE, where=None):
+        """
+        Top-k corpus rows by cosine similarity for each query text.
+        where(rows) -> bool mask, if given, filters candidate rows (e.g. by language).
+        Returns [(row ids, scores)] per query, best first; queries with no known
+        words return no rows.
+        """
+        q = self.embed(queries)
+        nprobe = min(nprobe, self.lists)
+        probes = np.argpartition(-(q @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe] \
+            if nprobe < self.lists else np.broadcast_to(np.arange(self.lists), (len(q), self.lists))
+        results = []
+        for vector, lists in zip(q, probes):
+            if not vector.any():
+                results.append((self.rows[:0].astype(np.int64), np.zeros(0, dtype=np.float32)))
+                continue
+            positions = np.concatenate([np.arange(int(self.list_offsets[c]), int(self.list_offsets[c + 1]))
+                                        for c in lists])
+            if where is not None:
+                positions = positions[where(self.rows[positions])]
+            scores = (self.vectors[positions] @ vector) * self.scales[positions]
+            if k < len(scores):
+                top = np.argpartition(-scores, k - 1)[:k]
+                positions, scores = positions[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            results.append((self.rows[positions[order]].astype(np.int64), scores[order]))
+        return results
+
+    def search(self, query, k=5, nprobe=NPROBE, where=None):
+        return self.search_many([query], k, nprobe, where)[0]
+
+
+if __name__ == "__main__":
+    # Benchmark on a synthetic corpus: python vector_index.py [n_posts]
+    import sys
+    import tempfile
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    # 300 topics of 40 words each; a post has 25 words of its topic and 40 of 2000 common words
+    rng = np.random.default_rng(1)
+    labels = rng.integers(0, 300, n)
+    topic_words = labels[:, None] * 40 + rng.integers(0, 40, (n, 25))
+    common_words = rng.integers(0, 2000, (n, 40))
+    texts = [" ".join([f"topic{w}" for w in t] + [f"common{w}" for w in c])
+             for t, c in zip(topic_words.tolist(), common_words.tolist())]
+    queries = texts[:200]
+
+    start = time.perf_counter()
+    path = write_index(texts, os.path.join(tempfile.mkdtemp(), "bench.vectors"))
+    print(f"built index of {n} posts in {time.perf_counter() - start:.1f}s "
+          f"({os.path.getsize(path) / 1e6:.0f} MB)")
+    index = VectorIndex.open(path)
+
+    for label, kwargs in [("exact (all clusters)", {"nprobe": index.lists}), (f"nprobe={NPROBE}", {})]:
+        start = time.perf_counter()
+        results = [index.search(q, k=10, **kwargs) for q in queries[:50 if "exact" in label else 200]]
+        per_query = (time.perf_counter() - start) / len(results) * 1000
+        precision = np.mean([np.mean(labels[rows] == labels[i]) for i, (rows, _) in enumerate(results)])
+        print(f"{label:<22} {per_query:7.2f} ms/query   top-10 same-topic precision {precision:.2f}")
+    start = time.perf_counter()
+    index.search_many(queries, k=10)
+    print(f"search_many x{len(queries):<10} {(time.perf_counter() - start) / len(queries) * 1000:7.2f} ms/query")